@@ -14,9 +14,11 @@ from .mcp_server import (
     create_chatlog_mcp_server,
     get_chatlog_tools_info,
     get_chatlog_stats_sync,
+    get_chatlog_stats_async,
     close_chatlog_clients,
     compose_chatlog_query_sync,
     compose_chatlog_analysis_sync,
+    compose_chatlog_analysis_async,
 )
 
 __all__ = [
@@ -28,8 +30,10 @@ __all__ = [
     "create_chatlog_mcp_server",
     "get_chatlog_tools_info",
     "get_chatlog_stats_sync",
+    "get_chatlog_stats_async",
     "close_chatlog_clients",
     "compose_chatlog_query_sync",
     "compose_chatlog_analysis_sync",
+    "compose_chatlog_analysis_async",
 ]
 
@@ -7,10 +7,13 @@ Uses Poe API with Gemini-2.5-Flash-Lite for:
 """
 
 import os
+import copy
 import json
 import asyncio
 import re
-from typing import List, Optional, Dict, Any
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Tuple
 from dataclasses import dataclass
 
 # Load environment variables
@@ -31,6 +34,11 @@ except ImportError:
     PoeConfig = None
 
 
+# Borrow/credit cues, matched in a single pass over the question
+_BORROW_TRIGGER_RE = re.compile("|".join(map(re.escape, (
+    "借", "借钱", "借款", "还款", "还钱", "欠钱", "信用", "信誉", "信任"
+))))
+
 
 @dataclass
 class CleanerConfig:
@@ -43,6 +51,7 @@ class CleanerConfig:
     char_threshold: int = 1500  # Trigger cleaning if above this (reduced from 3000)
     target_chars: int = 800  # Target size after cleaning (reduced from 2000)
     timeout: int = 30
+    expand_cache_size: int = 256  # LLM query expansions kept per cleaner (0 disables)
 
 
 class ChatlogCleaner:
@@ -65,17 +74,25 @@ class ChatlogCleaner:
             self.config.model = env_model
         
         self._poe_client: Optional[PoeClient] = None
+        self._poe_unavailable_reported = False
+        self._expand_cache: "OrderedDict[tuple, tuple[List[str], Dict[str, Any]]]" = OrderedDict()
+        # (source topic list, its length, stripped topics, their set, lowercase haystack, start offsets)
+        self._topic_scan: Optional[Tuple[List[str], int, List[str], set, str, List[int]]] = None
     
     def _get_poe_client(self) -> Optional["PoeClient"]:
-        """Get or create Poe client."""
+        """Get or create Poe client (the missing-client notice is printed once)."""
         if PoeClient is None:
-            print("Poe client not available")
+            if not self._poe_unavailable_reported:
+                print("Poe client not available")
+                self._poe_unavailable_reported = True
             return None
         
         if self._poe_client is None:
             api_key = os.getenv("POE_API_KEY", "")
             if not api_key:
-                print("POE_API_KEY not configured")
+                if not self._poe_unavailable_reported:
+                    print("POE_API_KEY not configured")
+                    self._poe_unavailable_reported = True
                 return None
             
             poe_config = PoeConfig(
@@ -142,6 +159,15 @@ class ChatlogCleaner:
                 metadata,
             )
 
+        # Only successful LLM expansions are cached; the topic list is part of the key,
+        # so a reloaded index with different topics misses naturally
+        topics_key = tuple(available_topics or ())
+        cache_key = (question, target_person, topics_key)
+        cached = self._expand_cache.get(cache_key)
+        if cached is not None:
+            self._expand_cache.move_to_end(cache_key)
+            return list(cached[0]), copy.deepcopy(cached[1])
+
         person_hint = f"\n目标人物: {target_person}" if target_person else ""
         topics_hint = ""
         if available_topics:
@@ -220,6 +246,10 @@ class ChatlogCleaner:
                         topics=metadata.get("topics", []),
                         available_topics=available_topics
                     )
+                    if self.config.expand_cache_size > 0:
+                        self._expand_cache[cache_key] = (list(keywords), copy.deepcopy(metadata))
+                        while len(self._expand_cache) > self.config.expand_cache_size:
+                            self._expand_cache.popitem(last=False)
                     return keywords, metadata
 
         except Exception as e:
@@ -539,7 +569,7 @@ class ChatlogCleaner:
             topics = [topics]
         topics = [t.strip() for t in topics if isinstance(t, str) and t.strip()]
         if available_topics:
-            allowed = {t.strip() for t in available_topics if t.strip()}
+            allowed = self._get_topic_scan(available_topics)[1]
             topics = [t for t in topics if t in allowed]
 
         facts = metadata.get("facts", {}) or {}
@@ -558,8 +588,7 @@ class ChatlogCleaner:
 
     def _is_borrow_question(self, question: str) -> bool:
         """Detect borrow/credit-related questions for topic biasing."""
-        triggers = ("借", "借钱", "借款", "还款", "还钱", "欠钱", "信用", "信誉", "信任")
-        return any(t in question for t in triggers)
+        return _BORROW_TRIGGER_RE.search(question) is not None
 
     def _inject_borrow_topics(
         self,
@@ -571,7 +600,7 @@ class ChatlogCleaner:
             return topics
 
         topic_set = set(topics)
-        available_set = {t.strip() for t in available_topics if t.strip()}
+        available_set = self._get_topic_scan(available_topics)[1]
         desired = [
             "借贷",
             "金钱",
@@ -603,14 +632,15 @@ class ChatlogCleaner:
         if not available_topics:
             return topics[: self.config.max_topics]
 
-        allowed = [t.strip() for t in available_topics if t.strip()]
+        allowed, allowed_set, haystack, starts = self._get_topic_scan(available_topics)
         topic_list: List[str] = []
         for item in topics:
-            if item in allowed and item not in topic_list:
+            if item in allowed_set and item not in topic_list:
                 topic_list.append(item)
 
-        if target_person and target_person in allowed and target_person not in topic_list:
+        if target_person and target_person in allowed_set and target_person not in topic_list:
             topic_list.insert(0, target_person)
+        selected = set(topic_list)
 
         terms: List[str] = []
         for item in keywords:
@@ -622,24 +652,63 @@ class ChatlogCleaner:
             if len(topic_list) >= self.config.max_topics:
                 break
             term_lower = term.lower()
-            for topic in allowed:
+            if not term_lower:
+                continue
+            if "\n" in term_lower:
+                # Would straddle the haystack separator; scan the topics directly
+                hits = (i for i, topic in enumerate(allowed) if term_lower in topic.lower())
+            else:
+                hits = self._scan_topics(term_lower, haystack, starts)
+            for idx in hits:
                 if len(topic_list) >= self.config.max_topics:
                     break
-                if topic in topic_list:
-                    continue
-                if term_lower and term_lower in topic.lower():
+                topic = allowed[idx]
+                if topic not in selected:
                     topic_list.append(topic)
+                    selected.add(topic)
 
         min_count = min(self.config.min_topics, len(allowed))
         if len(topic_list) < min_count:
             for topic in allowed:
                 if len(topic_list) >= min_count:
                     break
-                if topic not in topic_list:
+                if topic not in selected:
                     topic_list.append(topic)
+                    selected.add(topic)
 
         return topic_list[: self.config.max_topics]
 
+    def _get_topic_scan(
+        self,
+        available_topics: List[str]
+    ) -> Tuple[List[str], set, str, List[int]]:
+        """Stripped topics plus a newline-joined lowercase haystack, rebuilt only when the list changes."""
+        cached = self._topic_scan
+        if cached is not None and cached[0] is available_topics and cached[1] == len(available_topics):
+            return cached[2], cached[3], cached[4], cached[5]
+        allowed = [t.strip() for t in available_topics if t.strip()]
+        lowered = [t.lower() for t in allowed]
+        starts: List[int] = []
+        offset = 0
+        for topic in lowered:
+            starts.append(offset)
+            offset += len(topic) + 1
+        haystack = "\n".join(lowered)
+        allowed_set = set(allowed)
+        self._topic_scan = (available_topics, len(available_topics), allowed, allowed_set, haystack, starts)
+        return allowed, allowed_set, haystack, starts
+
+    @staticmethod
+    def _scan_topics(term_lower: str, haystack: str, starts: List[int]):
+        """Yield indexes of topics containing term_lower, in topic order, via str.find."""
+        pos = haystack.find(term_lower)
+        while pos != -1:
+            idx = bisect_right(starts, pos) - 1
+            yield idx
+            if idx + 1 >= len(starts):
+                return
+            pos = haystack.find(term_lower, starts[idx + 1])
+
     def _extract_terms(self, question: str) -> List[str]:
         """Extract simple CJK terms for topic matching."""
         import re
@@ -6,10 +6,17 @@ Loads cleaned_chatlog.jsonl and provides efficient access to messages.
 
 import os
 import json
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
+import numpy as np
+
+
+# Per-keyword search results kept for follow-up queries (ReAct loops repeat keywords)
+KEYWORD_SEARCH_CACHE_SIZE = 256
+
 
 @dataclass
 class ChatMessage:
@@ -51,6 +58,7 @@ class ChatlogLoader:
     - Lazy loading with caching
     - Sender-based indexing
     - Topic-based indexing
+    - Character postings for case-insensitive substring search
     """
     
     def __init__(self, file_path: Optional[str] = None):
@@ -68,6 +76,15 @@ class ChatlogLoader:
         self.file_path = file_path
         self._messages: Optional[List[ChatMessage]] = None
         self._sender_index: Dict[str, List[int]] = {}  # sender -> [line_numbers]
+        self._keyword_cache: "OrderedDict[str, Tuple[int, ...]]" = OrderedDict()
+        # lowercased sender query -> its messages, in line order
+        self._sender_cache: Dict[str, Tuple[ChatMessage, ...]] = {}
+        # Built at load, all in message positions (indexes into _messages):
+        # lowercased content character -> ascending positions containing it
+        self._char_postings: Dict[str, np.ndarray] = {}
+        # lowercased topic / fact key -> ascending positions carrying it
+        self._topic_postings: Dict[str, List[int]] = {}
+        self._fact_key_postings: Dict[str, List[int]] = {}
         self._loaded = False
     
     @property
@@ -102,6 +119,8 @@ class ChatlogLoader:
         
         self._messages = []
         self._sender_index = {}
+        self._keyword_cache = OrderedDict()
+        self._sender_cache = {}
         
         try:
             with open(self.file_path, 'r', encoding='utf-8') as f:
@@ -145,6 +164,7 @@ class ChatlogLoader:
                     except json.JSONDecodeError:
                         continue
             
+            self._build_postings()
             self._loaded = True
             print(f"Loaded {len(self._messages)} messages from chatlog")
             return True
@@ -153,6 +173,66 @@ class ChatlogLoader:
             print(f"Error loading chatlog: {e}")
             return False
     
+    def _build_postings(self) -> None:
+        """Index message positions by content character, topic and fact key."""
+        messages = self._messages
+        lowered = [msg.content.lower() for msg in messages]
+        # (code point, position) pairs of every character, deduplicated and grouped
+        # by code point in one sort instead of a dict update per character
+        codes = np.frombuffer(
+            "".join(lowered).encode("utf-32-le", "surrogatepass"), dtype=np.uint32
+        ).astype(np.int64)
+        positions = np.repeat(
+            np.arange(len(messages), dtype=np.int64),
+            np.fromiter(map(len, lowered), dtype=np.int64, count=len(lowered)),
+        )
+        self._char_postings = {}
+        if codes.size:
+            pairs = np.sort(codes * len(messages) + positions)
+            pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+            pair_codes, pair_positions = np.divmod(pairs, len(messages))
+            starts = np.flatnonzero(np.r_[True, pair_codes[1:] != pair_codes[:-1]])
+            self._char_postings = dict(zip(
+                map(chr, pair_codes[starts].tolist()),
+                np.split(pair_positions.astype(np.int32), starts[1:]),
+            ))
+        
+        topics: Dict[str, List[int]] = {}
+        fact_keys: Dict[str, List[int]] = {}
+        for pos, msg in enumerate(messages):
+            for topic in {topic.lower() for topic in msg.topics}:
+                topics.setdefault(topic, []).append(pos)
+            if msg.facts:
+                for key in {key.lower() for key in msg.facts}:
+                    fact_keys.setdefault(key, []).append(pos)
+        self._topic_postings = topics
+        self._fact_key_postings = fact_keys
+    
+    def _content_positions(self, keyword_lower: str) -> List[int]:
+        """
+        Ascending positions of messages whose lowercased content contains
+        keyword_lower: intersect the postings of its characters, rarest first,
+        then confirm the substring on the survivors.
+        """
+        if not keyword_lower:
+            return list(range(len(self._messages)))
+        postings = [self._char_postings.get(char) for char in set(keyword_lower)]
+        if any(p is None for p in postings):
+            return []
+        postings.sort(key=len)
+        candidates = postings[0]
+        for p in postings[1:]:
+            if not candidates.size:
+                return []
+            candidates = np.intersect1d(candidates, p, assume_unique=True)
+        if len(keyword_lower) == 1:
+            return candidates.tolist()
+        messages = self._messages
+        return [
+            pos for pos in candidates.tolist()
+            if keyword_lower in messages[pos].content.lower()
+        ]
+    
     def get_message(self, line_number: int) -> Optional[ChatMessage]:
         """Get message by line number (1-indexed)."""
         if not self._loaded:
@@ -167,20 +247,44 @@ class ChatlogLoader:
             return self._messages[idx]
         return None
     
+    def get_messages(self, line_numbers: Iterable[int]) -> List[ChatMessage]:
+        """Get messages for several line numbers (1-indexed) in order, skipping missing ones."""
+        if not self._loaded:
+            self.load()
+        
+        messages = self._messages
+        if not messages:
+            return []
+        
+        count = len(messages)
+        return [messages[ln - 1] for ln in line_numbers if 0 < ln <= count]
+    
     def get_messages_by_sender(self, sender: str) -> List[ChatMessage]:
         """Get all messages from a specific sender."""
+        return list(self._sender_messages(sender))
+    
+    def get_line_numbers_by_sender(self, sender: str) -> List[int]:
+        """Line numbers of get_messages_by_sender(sender), without copying the messages."""
+        return [msg.line_number for msg in self._sender_messages(sender)]
+    
+    def _sender_messages(self, sender: str) -> Tuple[ChatMessage, ...]:
+        """Messages of senders whose name contains `sender`, cached until the next load()."""
         if not self._loaded:
             self.load()
         
+        key = sender.lower()
+        cached = self._sender_cache.get(key)
+        if cached is not None:
+            return cached
+        
         result = []
         for name, line_numbers in self._sender_index.items():
-            if sender.lower() in name.lower():
-                for ln in line_numbers:
-                    msg = self.get_message(ln)
-                    if msg:
-                        result.append(msg)
+            if key in name.lower():
+                result.extend(self.get_messages(line_numbers))
         
-        return sorted(result, key=lambda m: m.line_number)
+        cached = tuple(sorted(result, key=lambda m: m.line_number))
+        self._sender_cache[key] = cached
+        return cached
     
     def get_all_messages(self) -> List[ChatMessage]:
         """Get all messages."""
@@ -235,15 +339,11 @@ class ChatlogLoader:
         if not self._messages:
             return []
         
-        results = []
-        search_term = keyword if case_sensitive else keyword.lower()
+        if not case_sensitive:
+            messages = self._messages
+            return [messages[pos].line_number for pos in self._content_positions(keyword.lower())]
         
-        for msg in self._messages:
-            content = msg.content if case_sensitive else msg.content.lower()
-            if search_term in content:
-                results.append(msg.line_number)
-        
-        return results
+        return [msg.line_number for msg in self._messages if keyword in msg.content]
     
     def search_topics(self, keywords: List[str]) -> List[int]:
         """
@@ -414,6 +514,64 @@ class ChatlogLoader:
         
         return sorted(all_results)
     
+    def search_keywords(self, keywords: List[str]) -> Dict[str, List[int]]:
+        """
+        Per-keyword comprehensive search over the postings built at load.
+        
+        Equivalent to calling comprehensive_search([keyword]) for each keyword:
+        content goes through the character postings, topics and fact keys
+        through their distinct lowercased names.
+        Results are kept in an LRU cache until the next load().
+        
+        Args:
+            keywords: Keywords to search
+            
+        Returns:
+            Keyword -> ascending line numbers matching it in content, topics or facts
+        """
+        if not self._loaded:
+            self.load()
+        
+        results: Dict[str, List[int]] = {keyword: [] for keyword in keywords}
+        if not self._messages:
+            return results
+        
+        cache = self._keyword_cache
+        missing: List[str] = []
+        for keyword in results:
+            cached = cache.get(keyword)
+            if cached is None:
+                missing.append(keyword)
+            else:
+                cache.move_to_end(keyword)
+                results[keyword] = list(cached)
+        if not missing:
+            return results
+        
+        # Case variants match the same lines, so each lowered form is looked up once
+        messages = self._messages
+        lowered: Dict[str, List[int]] = {}
+        for keyword in missing:
+            keyword_lower = keyword.lower()
+            if keyword_lower in lowered:
+                continue
+            positions = set(self._content_positions(keyword_lower))
+            for topic, topic_positions in self._topic_postings.items():
+                if keyword_lower in topic or topic in keyword_lower:
+                    positions.update(topic_positions)
+            for key, key_positions in self._fact_key_postings.items():
+                if keyword_lower in key:
+                    positions.update(key_positions)
+            lowered[keyword_lower] = [messages[pos].line_number for pos in sorted(positions)]
+        
+        for keyword in missing:
+            matching = lowered[keyword.lower()]
+            results[keyword] = list(matching)
+            cache[keyword] = tuple(matching)
+        while len(cache) > KEYWORD_SEARCH_CACHE_SIZE:
+            cache.popitem(last=False)
+        return results
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the loaded chatlog."""
         if not self._loaded:
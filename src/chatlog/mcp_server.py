@@ -9,16 +9,34 @@ Provides MCP tools for intelligent chatlog retrieval:
 
 import os
 import re
+import sys
 import json
 import time
 import uuid
+import heapq
+import logging
 import asyncio
-from typing import Optional, Dict, Any, List, Tuple
-
+import threading
+import traceback
+import functools
+import operator
+import itertools
+from collections import Counter, OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+
+import numpy as np
 from claude_agent_sdk import tool, create_sdk_mcp_server
 
+# Optional libuv event loop for the *_sync wrappers (not available on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 from .loader import ChatlogLoader, get_chatlog_loader
-from .searcher import ChatlogSearcher, SearchResult
+from .searcher import ChatlogSearcher, SearchResult, _window_lines
 from .cleaner import ChatlogCleaner, CleanerConfig
 from .metadata_index_loader import MetadataIndexLoader, get_index_loader
 from .semantic_index import get_semantic_index
@@ -28,6 +46,14 @@ from .semantic_index import get_semantic_index
 # MCP Tool Definitions
 # ═══════════════════════════════════════════════════════════════════════════════
 
+_logger = logging.getLogger(__name__)
+if os.getenv("CHATLOG_VERBOSE", "0") == "1":
+    # Echo tool diagnostics to stdout like the old prints; otherwise only warnings surface
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    _logger.addHandler(_handler)
+    _logger.setLevel(logging.INFO)
+
 # Global instances
 _chatlog_loader: Optional[ChatlogLoader] = None
 _chatlog_searcher: Optional[ChatlogSearcher] = None
@@ -49,9 +75,92 @@ _CHATLOG_LOAD_CONTEXT_BEFORE = int(os.getenv("CHATLOG_LOAD_CONTEXT_BEFORE", "2")
 _CHATLOG_LOAD_CONTEXT_AFTER = int(os.getenv("CHATLOG_LOAD_CONTEXT_AFTER", "2"))  # 提升：上下文
 _CHATLOG_LOAD_MAX_MESSAGES = int(os.getenv("CHATLOG_LOAD_MAX_MESSAGES", "60"))  # 提升：20→60
 _CHATLOG_SNIPPET_CHARS = int(os.getenv("CHATLOG_SNIPPET_CHARS", "150"))  # 稍微放宽
+_CHATLOG_TOOL_ALERT_CHARS = int(os.getenv("CHATLOG_TOOL_ALERT_CHARS", "12000"))
+_CHATLOG_SEM_TOP_K = int(os.getenv("CHATLOG_SEM_TOP_K", "100"))  # 提升：有压缩可以召回更多
+# Composed query skips the embedding request once topic hits reach this count (0 = never)
+_CHATLOG_SEM_SKIP_TOPIC_HITS = int(os.getenv("CHATLOG_SEM_SKIP_TOPIC_HITS", "0"))
+
+# Ranking weights, normalized once to sum to 1
+_sem_weight = float(os.getenv("CHATLOG_SEM_WEIGHT", "0.6"))
+_kw_weight = float(os.getenv("CHATLOG_KW_WEIGHT", "0.4"))
+_weight_sum = _sem_weight + _kw_weight if (_sem_weight + _kw_weight) > 0 else 1.0
+_CHATLOG_SEM_WEIGHT = _sem_weight / _weight_sum
+_CHATLOG_KW_WEIGHT = _kw_weight / _weight_sum
+del _sem_weight, _kw_weight, _weight_sum
+
+
+@dataclass(frozen=True, slots=True)
+class _IndexQueryConfig:
+    """Limits and ranking weights for the indexed query, fixed at import."""
+    context_before: int
+    context_after: int
+    max_return_chars: int
+    max_results: int
+    sem_weight: float
+    kw_weight: float
+    sem_top_k: int
+
+
+_INDEX_QUERY_CONFIG = _IndexQueryConfig(
+    context_before=_CHATLOG_INDEX_CONTEXT_BEFORE,
+    context_after=_CHATLOG_INDEX_CONTEXT_AFTER,
+    max_return_chars=_CHATLOG_MAX_RETURN_CHARS,
+    max_results=_CHATLOG_INDEX_MAX_RESULTS,
+    sem_weight=_CHATLOG_SEM_WEIGHT,
+    kw_weight=_CHATLOG_KW_WEIGHT,
+    sem_top_k=_CHATLOG_SEM_TOP_K,
+)
+
+# In-process evidence cache, oldest first; payloads are kept as live objects, never serialized
+_EVIDENCE_STORE: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+def _elapsed_ms(started_ns: int) -> int:
+    """Whole milliseconds since a time.monotonic_ns() start mark."""
+    return (time.monotonic_ns() - started_ns) // 1_000_000
+
 
-_EVIDENCE_STORE: Dict[str, Dict[str, Any]] = {}
-_EVIDENCE_STORE_ORDER: List[str] = []
+class _QueryLog:
+    """Per-query step log, buffered and written to stdout in one go by flush()."""
+
+    __slots__ = ("tag", "_entries", "_wall_start", "_mono_start")
+
+    def __init__(self, tag: str):
+        self.tag = tag
+        self._entries: List[Tuple[float, str, str]] = []
+        self._wall_start = time.time()
+        self._mono_start = time.monotonic()
+
+    def __call__(self, msg: str, phase: str = "") -> None:
+        self._entries.append((time.monotonic(), phase, msg))
+
+    def flush(self) -> None:
+        if not self._entries:
+            return
+        offset = self._wall_start - self._mono_start
+        lines = []
+        for stamp, phase, msg in self._entries:
+            ts = time.strftime("%H:%M:%S", time.localtime(stamp + offset))
+            ms = int((stamp + offset) % 1 * 1000)
+            phase_str = f" [{phase}]" if phase else ""
+            lines.append(f"[{self.tag}] [{ts}.{ms:03d}]{phase_str} {msg}")
+        self._entries.clear()
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+
+def _with_query_log(tag: str):
+    """Hand the wrapped query impl a fresh _QueryLog and flush it however the impl exits."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(args: dict) -> dict:
+            log = _QueryLog(tag)
+            try:
+                return await func(args, log)
+            finally:
+                log.flush()
+        return wrapper
+    return decorator
 
 
 def _cap_text(text: str, max_chars: int) -> str:
@@ -60,6 +169,17 @@ def _cap_text(text: str, max_chars: int) -> str:
         return text
     return text[:max_chars] + "\n...(已截断)"
 
+def _join_capped(parts: Sequence[str], max_chars: int, sep: str = "\n") -> str:
+    """Same result as _cap_text(sep.join(parts), max_chars), but stops joining once past the cap."""
+    if max_chars < 0:
+        return _cap_text(sep.join(parts), max_chars)
+    total = -len(sep)
+    for count, part in enumerate(parts, 1):
+        total += len(sep) + len(part)
+        if total > max_chars:
+            return sep.join(parts[:count])[:max_chars] + "\n...(已截断)"
+    return sep.join(parts)
+
 def _approx_tokens(chars: int) -> int:
     if chars <= 0:
         return 0
@@ -67,8 +187,11 @@ def _approx_tokens(chars: int) -> int:
 
 def _log_tool_payload(tool_name: str, payload: Dict[str, Any], chars: int) -> None:
     """Log tool result with token estimation and alert for large payloads."""
+    threshold_chars = _CHATLOG_TOOL_ALERT_CHARS
+    over_threshold = chars > threshold_chars
+    if not over_threshold and not _logger.isEnabledFor(logging.INFO):
+        return
     approx_tokens = _approx_tokens(chars)
-    threshold_chars = int(os.getenv("CHATLOG_TOOL_ALERT_CHARS", "12000"))
     
     # Extract field sizes
     data = payload.get("data", {}) if isinstance(payload, dict) else {}
@@ -82,22 +205,41 @@ def _log_tool_payload(tool_name: str, payload: Dict[str, Any], chars: int) -> No
     
     largest_key = max(key_sizes.items(), key=lambda x: x[1], default=("", 0))
     
-    if chars > threshold_chars:
-        print(f"[TOOL ALERT] ⚠️ {tool_name}: {chars} chars (~{approx_tokens} tokens) OVER THRESHOLD")
+    if over_threshold:
+        _logger.warning("[TOOL ALERT] ⚠️ %s: %d chars (~%d tokens) OVER THRESHOLD", tool_name, chars, approx_tokens)
         if largest_key[0]:
-            print(f"  └─ Largest field: '{largest_key[0]}' = {largest_key[1]} chars")
-        print(f"  └─ Fields: {list(key_sizes.keys())}")
+            _logger.warning("  └─ Largest field: '%s' = %d chars", largest_key[0], largest_key[1])
+        _logger.warning("  └─ Fields: %s", list(key_sizes.keys()))
     else:
-        print(f"[TOOL] {tool_name}: {chars} chars (~{approx_tokens} tokens)")
+        _logger.info("[TOOL] %s: %d chars (~%d tokens)", tool_name, chars, approx_tokens)
+
+def _truncate_list(items: Iterable[Any], limit: int, cursor_prefix: str) -> Tuple[List[Any], int, Optional[str]]:
+    """
+    Return (head, omitted_count, next_cursor) for the first `limit` items.
 
-def _truncate_list(items: List[Any], limit: int, cursor_prefix: str) -> Tuple[List[Any], int, Optional[str]]:
+    Sequences are sliced directly. Sets are returned in ascending order using a
+    bounded heap instead of sorting every member, and other iterables are
+    consumed lazily so only the head is materialized.
+    """
+    if isinstance(items, (set, frozenset)):
+        head = heapq.nsmallest(limit, items) if limit > 0 else []
+        omitted = len(items) - len(head)
+    elif isinstance(items, Sequence):
+        if limit <= 0:
+            return [], len(items), f"{cursor_prefix}#offset=0"
+        if len(items) <= limit:
+            return items, 0, None
+        head = items[:limit]
+        omitted = len(items) - limit
+    else:
+        iterator = iter(items)
+        head = list(itertools.islice(iterator, max(limit, 0)))
+        omitted = sum(1 for _ in iterator)
     if limit <= 0:
-        return [], len(items), f"{cursor_prefix}#offset=0"
-    if len(items) <= limit:
-        return items, 0, None
-    omitted = len(items) - limit
-    next_cursor = f"{cursor_prefix}#offset={limit}"
-    return items[:limit], omitted, next_cursor
+        return [], omitted, f"{cursor_prefix}#offset=0"
+    if omitted == 0:
+        return head, 0, None
+    return head, omitted, f"{cursor_prefix}#offset={limit}"
 
 def _build_snippet(text: str, max_chars: int) -> str:
     if not isinstance(text, str):
@@ -106,6 +248,13 @@ def _build_snippet(text: str, max_chars: int) -> str:
         return text
     return text[:max_chars].rstrip() + "…"
 
+
+def _clip_content(text: str, max_chars: int) -> str:
+    """Hard-cut message content to max_chars (no rstrip, unlike _build_snippet); 0 disables."""
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}…"
+
 # Slim data limits for preventing token explosion
 _SLIM_MAX_LIST = int(os.getenv("CHATLOG_SLIM_MAX_LIST", "50"))
 _SLIM_MAX_SNIPPET = int(os.getenv("CHATLOG_SLIM_MAX_SNIPPET", "200"))
@@ -152,10 +301,8 @@ def _slim_data(data: Dict[str, Any], depth: int = 0) -> Dict[str, Any]:
 def _store_evidence(payload: Dict[str, Any]) -> str:
     evidence_id = f"evi_{uuid.uuid4().hex[:12]}"
     _EVIDENCE_STORE[evidence_id] = payload
-    _EVIDENCE_STORE_ORDER.append(evidence_id)
-    if len(_EVIDENCE_STORE_ORDER) > _CHATLOG_EVIDENCE_CACHE_SIZE:
-        expired = _EVIDENCE_STORE_ORDER.pop(0)
-        _EVIDENCE_STORE.pop(expired, None)
+    while _EVIDENCE_STORE and len(_EVIDENCE_STORE) > _CHATLOG_EVIDENCE_CACHE_SIZE:
+        _EVIDENCE_STORE.popitem(last=False)
     return evidence_id
 
 def _get_evidence(evidence_id: str) -> Optional[Dict[str, Any]]:
@@ -215,13 +362,121 @@ def _error(
     return _build_response(False, payload, meta=meta, is_error=True, tool_name=tool_name)
 
 
+@functools.lru_cache(maxsize=4096)
 def _parse_sender_content(content: str) -> Tuple[str, str]:
+    """Split a raw "sender: body" line; memoized since hit windows overlap across calls."""
     if ": " in content:
         sender, body = content.split(": ", 1)
-        return sender, body
+        # Few distinct senders recur across many records; intern them for cheap dict keys
+        return sys.intern(sender), body
     return "", content
 
 
+def _merge_semantic_hits(lines: np.ndarray, sims: np.ndarray) -> Dict[int, float]:
+    """
+    Normalize cosine scores (-1..1 -> 0..1) and keep the best score per line.
+
+    Takes the (queries, k) arrays from SemanticIndex.search_batch; lines keep
+    the order of their first hit, query by query.
+    """
+    line_nums = np.asarray(lines, dtype=np.int64).ravel()
+    if not line_nums.size:
+        return {}
+    scores = np.clip((np.asarray(sims, dtype=np.float64).ravel() + 1.0) / 2.0, 0.0, 1.0)
+
+    order = np.argsort(line_nums, kind="stable")
+    sorted_lines = line_nums[order]
+    starts = np.flatnonzero(np.r_[True, sorted_lines[1:] != sorted_lines[:-1]])
+    best = np.maximum.reduceat(scores[order], starts)
+    emit = np.argsort(order[starts], kind="stable")
+    return dict(zip(sorted_lines[starts][emit].tolist(), best[emit].tolist()))
+
+
+def _mentions_target(target_person: Optional[str], sender: str, content: str) -> bool:
+    """Whether a message is from or mentions the target; checks the short sender first."""
+    if not target_person:
+        return False
+    return target_person in sender or target_person in content
+
+
+# Fields exposed in the per-dimension evidence views; full records stay in the evidence store
+_EVIDENCE_VIEW_FIELDS = ("line", "time", "sender", "snippet", "topics", "score")
+_COUNTER_VIEW_FIELDS = ("line", "time", "sender", "snippet", "score", "is_counter")
+
+
+def _project_records(records: Iterable[Dict[str, Any]], fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """Project evidence records onto a subset of their keys in one itemgetter pass."""
+    getter = operator.itemgetter(*fields)
+    return [dict(zip(fields, getter(record))) for record in records]
+
+
+# Score bonus for lines the index marks as medium/high information density
+_HIGH_INFO_BONUS = 0.15
+
+
+def _score_lines(
+    lines: np.ndarray,
+    keyword_lines: np.ndarray,
+    semantic_lines: Dict[int, float],
+    high_info_lines: np.ndarray,
+    kw_weight: float,
+    sem_weight: float,
+) -> np.ndarray:
+    """
+    Score candidate lines in one vectorized pass.
+
+    A line earns kw_weight for a topic/keyword hit, sem_weight times its
+    normalized semantic score, and _HIGH_INFO_BONUS for high-value lines.
+    """
+    scores = np.where(np.isin(lines, keyword_lines), kw_weight, 0.0)
+    if semantic_lines:
+        sem_keys = np.fromiter(semantic_lines.keys(), dtype=np.int64, count=len(semantic_lines))
+        sem_vals = np.fromiter(semantic_lines.values(), dtype=np.float64, count=len(semantic_lines))
+        order = np.argsort(sem_keys)
+        pos = order[np.minimum(np.searchsorted(sem_keys, lines, sorter=order), sem_keys.size - 1)]
+        scores = scores + sem_weight * np.where(sem_keys[pos] == lines, sem_vals[pos], 0.0)
+    return scores + np.where(np.isin(lines, high_info_lines), _HIGH_INFO_BONUS, 0.0)
+
+
+def _unique_lines(postings: Iterable[Iterable[int]]) -> np.ndarray:
+    """Sorted, deduplicated line numbers across several posting lists."""
+    arrays = [np.asarray(lines, dtype=np.int64) for lines in postings]
+    if not arrays:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.concatenate(arrays))
+
+
+def _discard_task(task: asyncio.Task) -> None:
+    """Cancel a task nobody will await, or mark its exception retrieved if it already finished."""
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()
+
+
+def _top_k_indices(lines: np.ndarray, scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k best lines, highest score first and ties by ascending line.
+
+    Partitions around the k-th score instead of sorting every candidate, then
+    orders only the selected slice.
+    """
+    n = lines.size
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        kth_score = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth_score)
+        ties = np.flatnonzero(scores == kth_score)
+        needed = k - above.size
+        if needed < ties.size:
+            ties = ties[np.argpartition(lines[ties], needed - 1)[:needed]]
+        idx = np.concatenate((above, ties))
+    else:
+        idx = np.arange(n)
+    return idx[np.lexsort((lines[idx], -scores[idx]))]
+
+
 def _extract_payload(result: Dict[str, Any]) -> Dict[str, Any]:
     """Extract structured payload from a tool result."""
     if not result or "content" not in result or not result["content"]:
@@ -359,7 +614,8 @@ def _get_cleaner() -> ChatlogCleaner:
         config = CleanerConfig(
             model=os.getenv("CHATLOG_CLEANER_MODEL", "Gemini-2.5-Flash-Lite"),
             char_threshold=int(os.getenv("CHATLOG_CHAR_THRESHOLD", "3000")),
-            target_chars=int(os.getenv("CHATLOG_TARGET_CHARS", "2000"))
+            target_chars=int(os.getenv("CHATLOG_TARGET_CHARS", "2000")),
+            expand_cache_size=int(os.getenv("CHATLOG_EXPAND_CACHE_SIZE", "256")),
         )
         _chatlog_cleaner = ChatlogCleaner(config)
     return _chatlog_cleaner
@@ -367,27 +623,20 @@ def _get_cleaner() -> ChatlogCleaner:
 
 # Internal implementations (undecorated, for sync use)
 
-async def _query_chatlog_indexed_impl(args: dict) -> dict:
+@_with_query_log("CHATLOG INDEX")
+async def _query_chatlog_indexed_impl(args: dict, log: _QueryLog) -> dict:
     """
     Optimized query implementation using pre-built metadata index.
     
     Uses O(1) topic lookups instead of linear scans.
     Returns compact results to avoid context explosion.
     """
-    import time
-    import datetime
-    
     query_start_time = time.time()
-    
-    def log(msg: str, phase: str = ""):
-        """Log with millisecond timestamp."""
-        ts = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        phase_str = f" [{phase}]" if phase else ""
-        print(f"[CHATLOG INDEX] [{ts}]{phase_str} {msg}")
+    cfg = _INDEX_QUERY_CONFIG
     
     question = args.get("question", "")
     target_person = args.get("target_person")
-    max_results = min(int(args.get("max_results", 20)), _CHATLOG_INDEX_MAX_RESULTS)
+    max_results = min(int(args.get("max_results", 20)), cfg.max_results)
     
     log(f"🚀 开始索引查询", "START")
     log(f"📝 问题: '{question}' (人物: {target_person or '无'})")
@@ -399,98 +648,114 @@ async def _query_chatlog_indexed_impl(args: dict) -> dict:
     index_loader = get_index_loader()
     if not index_loader.load_index():
         log("⚠️ 索引未找到，回退到旧实现", "FALLBACK")
+        log.flush()
         return await _query_chatlog_impl(args)
     
     log(
         f"✓ 索引已加载: {len(index_loader.available_topics)} 话题 | 文件: {index_loader.index_path}"
     )
     
-    # Step 1: Use cleaner to identify topics from question
-    cleaner = _get_cleaner()
-    poe_client = cleaner._get_poe_client()
-    
-    keywords = []
-    if poe_client and poe_client.is_configured:
-        log(f"🔑 使用小模型识别话题: {cleaner.config.model}")
-        start = time.time()
-        keywords, query_metadata = await cleaner.expand_query(
-            question, target_person, index_loader.available_topics
-        )
-        selected_topics = query_metadata.get("topics", [])
-        log(f"   ✓ 可用话题标签数: {len(index_loader.available_topics)}", "TOPICS")
-        log(
-            f"   ✓ 识别话题({len(selected_topics)}): {', '.join(selected_topics) if selected_topics else '无'}",
-            "TOPICS"
-        )
-        log(f"   ✓ 关键词({len(keywords)}): {', '.join(keywords)}", "KEYWORDS")
-        log(f"   ✓ 扩展耗时: {time.time()-start:.2f}s")
-    else:
-        log("⚠️ Poe API未配置，使用模糊匹配")
-        # Fallback: fuzzy match topics based on question keywords
-        selected_topics = []
-        if "借" in question or "钱" in question:
-            for topic in ("借贷", "金钱"):
-                if topic in index_loader.available_topics:
-                    selected_topics.append(topic)
-        if target_person and target_person in index_loader.available_topics:
-            selected_topics.append(target_person)
-        keywords = cleaner._fallback_keyword_extraction(
-            question, target_person, index_loader.available_topics
-        )
-        selected_topics = cleaner._ensure_topic_coverage(
-            question=question,
-            target_person=target_person,
-            keywords=keywords,
-            topics=selected_topics,
-            available_topics=index_loader.available_topics
-        )
-        log(f"   ✓ 可用话题标签数: {len(index_loader.available_topics)}", "TOPICS")
-        log(
-            f"   ✓ 识别话题({len(selected_topics)}): {', '.join(selected_topics) if selected_topics else '无'}",
-            "TOPICS"
+    # Semantic recall only needs the question: start it now so the embedding request
+    # and matrix sweep overlap with the topic-identification LLM call below
+    sem_top_k = cfg.sem_top_k
+    semantic_index = get_semantic_index()
+    semantic_task: Optional[asyncio.Task] = None
+    if semantic_index.is_available():
+        semantic_task = asyncio.create_task(
+            asyncio.to_thread(semantic_index.search, question, top_k=sem_top_k)
         )
-        log(f"   ✓ 关键词({len(keywords)}): {', '.join(keywords)}", "KEYWORDS")
-    
-    # Step 2: Search by topics using index (O(1) per topic)
-    log("🔍 Step 2: 索引搜索...", "SEARCH")
-    start = time.time()
 
-    matched_lines = set()
+    try:
+        # Step 1: Use cleaner to identify topics from question
+        cleaner = _get_cleaner()
+        poe_client = cleaner._get_poe_client()
+        
+        keywords = []
+        if poe_client and poe_client.is_configured:
+            log(f"🔑 使用小模型识别话题: {cleaner.config.model}")
+            start = time.time()
+            keywords, query_metadata = await cleaner.expand_query(
+                question, target_person, index_loader.available_topics
+            )
+            selected_topics = query_metadata.get("topics", [])
+            log(f"   ✓ 可用话题标签数: {len(index_loader.available_topics)}", "TOPICS")
+            log(
+                f"   ✓ 识别话题({len(selected_topics)}): {', '.join(selected_topics) if selected_topics else '无'}",
+                "TOPICS"
+            )
+            log(f"   ✓ 关键词({len(keywords)}): {', '.join(keywords)}", "KEYWORDS")
+            log(f"   ✓ 扩展耗时: {time.time()-start:.2f}s")
+        else:
+            log("⚠️ Poe API未配置，使用模糊匹配")
+            # Fallback: fuzzy match topics based on question keywords
+            selected_topics = []
+            topic_set = index_loader.available_topics_set
+            if "借" in question or "钱" in question:
+                for topic in ("借贷", "金钱"):
+                    if topic in topic_set:
+                        selected_topics.append(topic)
+            if target_person and target_person in topic_set:
+                selected_topics.append(target_person)
+            keywords = cleaner._fallback_keyword_extraction(
+                question, target_person, index_loader.available_topics
+            )
+            selected_topics = cleaner._ensure_topic_coverage(
+                question=question,
+                target_person=target_person,
+                keywords=keywords,
+                topics=selected_topics,
+                available_topics=index_loader.available_topics
+            )
+            log(f"   ✓ 可用话题标签数: {len(index_loader.available_topics)}", "TOPICS")
+            log(
+                f"   ✓ 识别话题({len(selected_topics)}): {', '.join(selected_topics) if selected_topics else '无'}",
+                "TOPICS"
+            )
+            log(f"   ✓ 关键词({len(keywords)}): {', '.join(keywords)}", "KEYWORDS")
+        
+        # Step 2: Search by topics using index (O(1) per topic)
+        log("🔍 Step 2: 索引搜索...", "SEARCH")
+        start = time.time()
 
-    # Search by selected topics
-    log(f"   ✓ 使用话题检索: {len(selected_topics)} 个", "SEARCH")
-    for topic in selected_topics:
-        lines = index_loader.search_by_topic_exact(topic)
-        matched_lines.update(lines[:max_results])
-    
-    # Only search by selected topics (keywords are used for topic selection only)
+        sem_weight, kw_weight = cfg.sem_weight, cfg.kw_weight
 
-    # Semantic recall (optional, uses local embeddings cache)
-    sem_weight = float(os.getenv("CHATLOG_SEM_WEIGHT", "0.6"))
-    kw_weight = float(os.getenv("CHATLOG_KW_WEIGHT", "0.4"))
-    weight_sum = sem_weight + kw_weight if (sem_weight + kw_weight) > 0 else 1.0
-    sem_weight /= weight_sum
-    kw_weight /= weight_sum
-    sem_top_k = int(os.getenv("CHATLOG_SEM_TOP_K", "100"))  # 提升：有压缩可以召回更多
-    semantic_scores: Dict[int, float] = {}
+        async def _search_topics() -> np.ndarray:
+            # Only search by selected topics (keywords are used for topic selection only)
+            log(f"   ✓ 使用话题检索: {len(selected_topics)} 个", "SEARCH")
+            return _unique_lines(
+                index_loader.search_by_topic_exact(topic)[:max_results]
+                for topic in selected_topics
+            )
 
-    semantic_index = get_semantic_index()
-    if semantic_index.is_available():
-        log("   ✓ 语义检索: 已启用", "SEARCH")
-        semantic_matches = semantic_index.search(question, top_k=sem_top_k)
-        for line_num, score in semantic_matches:
+        async def _search_semantic() -> Tuple[np.ndarray, np.ndarray]:
+            # Semantic recall (optional, uses local embeddings cache)
+            if semantic_task is None:
+                log("   ⚠️ 语义检索: 未启用 (缺少 embeddings 缓存)", "SEARCH")
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+            log("   ✓ 语义检索: 已启用", "SEARCH")
+            semantic_matches = await semantic_task
+            lines = np.fromiter((line_num for line_num, _ in semantic_matches), dtype=np.int64)
+            scores = np.fromiter((score for _, score in semantic_matches), dtype=np.float64)
             # Normalize cosine (-1..1) -> (0..1)
-            semantic_scores[line_num] = max(0.0, min(1.0, (score + 1.0) / 2.0))
-        log(
-            f"   ✓ 语义命中: {len(semantic_scores)} 条 | top_k={sem_top_k}",
-            "SEARCH"
+            scores = np.clip((scores + 1.0) / 2.0, 0.0, 1.0)
+            log(
+                f"   ✓ 语义命中: {lines.size} 条 | top_k={sem_top_k}",
+                "SEARCH"
+            )
+            return lines, scores
+
+        matched_lines, (semantic_lines, semantic_scores) = await asyncio.gather(
+            _search_topics(),
+            _search_semantic()
         )
-    else:
-        log("   ⚠️ 语义检索: 未启用 (缺少 embeddings 缓存)", "SEARCH")
+    finally:
+        if semantic_task is not None:
+            # An early exit leaves the task unawaited; drop it without an unretrieved-exception warning
+            _discard_task(semantic_task)
 
-    log(f"   ✓ 匹配消息: {len(matched_lines)} 条 ({time.time()-start:.2f}s)")
+    log(f"   ✓ 匹配消息: {matched_lines.size} 条 ({time.time()-start:.2f}s)")
     
-    if not matched_lines and not semantic_scores:
+    if not matched_lines.size and not semantic_lines.size:
         log("⚠️ 未找到匹配消息", "RESULT")
         return {
             "content": [{
@@ -503,24 +768,17 @@ async def _query_chatlog_indexed_impl(args: dict) -> dict:
     log("📄 Step 3: 加载消息...", "LOAD")
     start = time.time()
     
-    combined_lines = set(matched_lines) | set(semantic_scores.keys())
-    if not combined_lines:
-        combined_lines = set(matched_lines)
-
-    def _score(line_num: int) -> float:
-        score = 0.0
-        if line_num in matched_lines:
-            score += kw_weight * 1.0
-        if line_num in semantic_scores:
-            score += sem_weight * semantic_scores[line_num]
-        return score
-
-    scored_lines = sorted(combined_lines, key=lambda ln: (_score(ln), -ln), reverse=True)
-    sorted_lines = scored_lines[:max_results]
+    # Score the union in one pass: kw_weight for a topic hit plus the weighted semantic score
+    combined_lines = np.union1d(matched_lines, semantic_lines)
+    combined_scores = kw_weight * np.isin(combined_lines, matched_lines, assume_unique=True)
+    sem_pos = np.searchsorted(combined_lines, semantic_lines)
+    combined_scores[sem_pos] += sem_weight * semantic_scores
+    top_idx = _top_k_indices(combined_lines, combined_scores, max_results)
+    sorted_lines = combined_lines[top_idx].tolist()
     messages = index_loader.get_messages_by_lines(
         sorted_lines,
-        context_before=_CHATLOG_INDEX_CONTEXT_BEFORE,
-        context_after=_CHATLOG_INDEX_CONTEXT_AFTER
+        context_before=cfg.context_before,
+        context_after=cfg.context_after
     )
     
     log(f"   ✓ 加载消息: {len(messages)} 条 ({time.time()-start:.2f}s)")
@@ -530,21 +788,32 @@ async def _query_chatlog_indexed_impl(args: dict) -> dict:
 
     message_map = {msg.get("line_number"): msg for msg in messages}
     filtered_samples: List[str] = []
+
+    # Person facts per loaded line, extracted once; windows overlap, so lines are shared
+    line_persons: Dict[int, frozenset] = {}
+    if target_person:
+        for ln, msg in message_map.items():
+            facts = (msg.get("metadata") or {}).get("facts") or {}
+            names = frozenset(
+                val.strip()
+                for val in (facts.get(key) for key in ("人物", "对象", "主体", "人"))
+                if isinstance(val, str) and val.strip()
+            )
+            if names:
+                line_persons[ln] = names
+
+    context_before, context_after = cfg.context_before, cfg.context_after
+
     def _window_mentions_other_person(line_num: int) -> bool:
         if not target_person:
             return False
-        start = max(1, line_num - _CHATLOG_INDEX_CONTEXT_BEFORE)
-        end = line_num + _CHATLOG_INDEX_CONTEXT_AFTER
+        start = max(1, line_num - context_before)
+        end = line_num + context_after
         persons = set()
         for ln in range(start, end + 1):
-            msg = message_map.get(ln)
-            if not msg:
-                continue
-            facts = (msg.get("metadata") or {}).get("facts") or {}
-            for key in ("人物", "对象", "主体", "人"):
-                val = facts.get(key)
-                if isinstance(val, str) and val.strip():
-                    persons.add(val.strip())
+            names = line_persons.get(ln)
+            if names:
+                persons |= names
         if not persons:
             return False
         if target_person not in persons:
@@ -577,29 +846,32 @@ async def _query_chatlog_indexed_impl(args: dict) -> dict:
     result_parts.append(f"匹配: {len(sorted_lines)} 条 | 返回: {len(messages)} 条")
     result_parts.append(f"关键词: {', '.join(keywords[:20]) if keywords else '无'}")
 
+    # Hit windows overlap, so format each loaded line once and reuse the row
+    row_text: Dict[int, str] = {}
+    for ln, msg in message_map.items():
+        raw = msg.get("content", "")
+        sender, body = _parse_sender_content(raw) if ": " in raw else ("未知", raw)
+        ts = msg.get("timestamp", "")[:19]
+        if msg.get("is_match"):
+            row_text[ln] = f"[{ts}] {sender}: {body} (行{ln} 命中 置信度:高)"
+        else:
+            row_text[ln] = f"[{ts}] {sender}: {body} (行{ln} 上下文 置信度:中)"
+
+    append = result_parts.append
+    window_span = f"±{context_before}/{context_after}"
     for idx, line_num in enumerate(sorted_lines, 1):
-        start = max(1, line_num - _CHATLOG_INDEX_CONTEXT_BEFORE)
-        end = line_num + _CHATLOG_INDEX_CONTEXT_AFTER
-        result_parts.append(
-            f"--- 命中窗口 {idx} (行 {line_num}, ±{_CHATLOG_INDEX_CONTEXT_BEFORE}/{_CHATLOG_INDEX_CONTEXT_AFTER}) ---"
-        )
+        start = max(1, line_num - context_before)
+        end = line_num + context_after
+        append(f"--- 命中窗口 {idx} (行 {line_num}, {window_span}) ---")
         for ln in range(start, end + 1):
-            msg = message_map.get(ln)
-            if not msg:
-                continue
-            raw = msg.get("content", "")
-            sender = "未知"
-            body = raw
-            if ": " in raw:
-                sender, body = raw.split(": ", 1)
-            ts = msg.get("timestamp", "")[:19]
-            tag = "命中" if msg.get("is_match") else "上下文"
-            confidence = "高" if msg.get("is_match") else "中"
-            result_parts.append(
-                f"[{ts}] {sender}: {body} (行{ln} {tag} 置信度:{confidence})"
-            )
+            row = row_text.get(ln)
+            if row is not None:
+                append(row)
 
-    raw_text = "\n".join(result_parts)
+    # Without a target person, window-formatted text is returned as-is up to the
+    # return cap, so only the part that survives the cap needs to be joined
+    windowed_passthrough = not target_person and any("命中窗口" in part for part in result_parts)
+    raw_text = "" if windowed_passthrough else "\n".join(result_parts)
 
     # Step 5: Second-pass selection (skip if already window-formatted)
     log("🧹 Step 5: 二次筛选清洗...", "CLEAN")
@@ -615,9 +887,12 @@ async def _query_chatlog_indexed_impl(args: dict) -> dict:
                 f"排除 {attr_stats.get('exclude_count', 0)} 条",
                 "CLEAN"
             )
-    if "命中窗口" in raw_text:
+    if windowed_passthrough or "命中窗口" in raw_text:
         cleaned = raw_text
         log("   跳过清洗：已包含命中窗口上下文(已做实体归因)", "CLEAN")
+    elif len(raw_text) <= cleaner.config.target_chars:
+        cleaned = raw_text
+        log("   跳过清洗：原文已在目标长度内", "CLEAN")
     else:
         if poe_client and poe_client.is_configured:
             log(f"   调用 {cleaner.config.model} 进行二次筛选...", "CLEAN")
@@ -629,9 +904,12 @@ async def _query_chatlog_indexed_impl(args: dict) -> dict:
             target_person=target_person,
             force=True
         )
-    log(f"   ✓ 清洗后: {len(cleaned)} 字符", "CLEAN")
 
-    result_text = _cap_text(cleaned, _CHATLOG_MAX_RETURN_CHARS)
+    if windowed_passthrough:
+        result_text = _join_capped(result_parts, cfg.max_return_chars)
+    else:
+        log(f"   ✓ 清洗后: {len(cleaned)} 字符", "CLEAN")
+        result_text = _cap_text(cleaned, cfg.max_return_chars)
     
     total_time = time.time() - query_start_time
     log(f"✅ 查询完成，准备返回给 Agent", "DONE")
@@ -642,14 +920,9 @@ async def _query_chatlog_indexed_impl(args: dict) -> dict:
     }
 
 
-async def _query_chatlog_composed_impl(args: dict) -> dict:
+@_with_query_log("CHATLOG MCP")
+async def _query_chatlog_composed_impl(args: dict, log: _QueryLog) -> dict:
     """Compose atomic tools to answer a chatlog query."""
-    import datetime
-
-    def log(msg: str, phase: str = ""):
-        ts = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        phase_str = f" [{phase}]" if phase else ""
-        print(f"[CHATLOG MCP] [{ts}]{phase_str} {msg}")
 
     question = args.get("question", "")
     target_person = args.get("target_person")
@@ -669,6 +942,7 @@ async def _query_chatlog_composed_impl(args: dict) -> dict:
     index_loader = get_index_loader()
     if not index_loader.load_index():
         log("⚠️ 索引未找到，回退到旧实现", "FALLBACK")
+        log.flush()
         return await _query_chatlog_impl(args)
 
     cleaner = _get_cleaner()
@@ -705,7 +979,7 @@ async def _query_chatlog_composed_impl(args: dict) -> dict:
     async def _search_topics() -> set[int]:
         lines: set[int] = set()
         for topic in topics:
-            lines.update(index_loader.search_by_topic_exact(topic))
+            lines.update(index_loader.search_by_topic_exact(topic).tolist())
         return lines
 
     async def _search_semantic() -> Dict[int, float]:
@@ -714,7 +988,7 @@ async def _query_chatlog_composed_impl(args: dict) -> dict:
             log("   ⚠️ 语义检索未启用 (缺少 embeddings 缓存)", "SEARCH")
             return {}
         log("   ✓ 语义检索启用", "SEARCH")
-        sem_top_k = int(os.getenv("CHATLOG_SEM_TOP_K", "100"))  # 提升：有压缩可以召回更多
+        sem_top_k = _CHATLOG_SEM_TOP_K
         semantic_matches = await asyncio.to_thread(
             semantic_index.search,
             question,
@@ -725,16 +999,16 @@ async def _query_chatlog_composed_impl(args: dict) -> dict:
             scores[line_num] = max(0.0, min(1.0, (score + 1.0) / 2.0))
         return scores
 
-    matched_lines, semantic_scores = await asyncio.gather(
-        _search_topics(),
-        _search_semantic()
-    )
+    # Topic lookups are local and cheap: run them first so a well-covered question
+    # can skip the embedding round trip
+    matched_lines = await _search_topics()
+    if _CHATLOG_SEM_SKIP_TOPIC_HITS and len(matched_lines) >= _CHATLOG_SEM_SKIP_TOPIC_HITS:
+        log(f"   ✓ 话题命中 {len(matched_lines)} 条，跳过语义检索", "SEARCH")
+        semantic_scores: Dict[int, float] = {}
+    else:
+        semantic_scores = await _search_semantic()
 
-    sem_weight = float(os.getenv("CHATLOG_SEM_WEIGHT", "0.6"))
-    kw_weight = float(os.getenv("CHATLOG_KW_WEIGHT", "0.4"))
-    weight_sum = sem_weight + kw_weight if (sem_weight + kw_weight) > 0 else 1.0
-    sem_weight /= weight_sum
-    kw_weight /= weight_sum
+    sem_weight, kw_weight = _CHATLOG_SEM_WEIGHT, _CHATLOG_KW_WEIGHT
 
     if not matched_lines and not semantic_scores:
         log("⚠️ 未找到匹配消息", "RESULT")
@@ -754,8 +1028,8 @@ async def _query_chatlog_composed_impl(args: dict) -> dict:
         return score
 
     combined_lines = set(matched_lines) | set(semantic_scores.keys())
-    ranked_lines = sorted(combined_lines, key=lambda ln: (_score(ln), -ln), reverse=True)
-    ranked_lines = ranked_lines[:max_results]
+    # Partial top-k: same order as sorted(..., reverse=True)[:max_results]
+    ranked_lines = heapq.nlargest(max_results, combined_lines, key=lambda ln: (_score(ln), -ln))
 
     log(f"📄 Step 3: 加载消息 (命中: {len(ranked_lines)})", "LOAD")
     messages = index_loader.get_messages_by_lines(
@@ -829,19 +1103,11 @@ async def _query_chatlog_composed_impl(args: dict) -> dict:
     log(f"✅ 查询完成，耗时 {total_time:.2f}s | 返回字符: {len(result_text)}", "DONE")
     return {"content": [{"type": "text", "text": result_text}]}
 
-async def _query_chatlog_impl(args: dict) -> dict:
+@_with_query_log("CHATLOG MCP")
+async def _query_chatlog_impl(args: dict, log: _QueryLog) -> dict:
     """Internal implementation of query_chatlog."""
-    import time
-    import datetime
-    
     query_start_time = time.time()  # Track total query time
     
-    def log(msg: str, phase: str = ""):
-        """Add log entry with millisecond timestamp."""
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        phase_str = f" [{phase}]" if phase else ""
-        print(f"[CHATLOG MCP] [{timestamp}]{phase_str} {msg}")
-    
     question = args.get("question", "")
     target_person = args.get("target_person")
     # Enforce a reasonable minimum max_results to avoid excessive outputs
@@ -960,6 +1226,9 @@ async def _query_chatlog_impl(args: dict) -> dict:
         if "命中窗口" in formatted:
             cleaned = formatted
             log("   跳过清洗：已包含命中窗口上下文(已做实体归因)")
+        elif len(formatted) <= cleaner.config.target_chars:
+            cleaned = formatted
+            log("   跳过清洗：原文已在目标长度内")
         else:
             if poe_client and poe_client.is_configured:
                 log(f"   调用 {cleaner.config.model} 进行二次筛选...")
@@ -1008,7 +1277,6 @@ async def _query_chatlog_impl(args: dict) -> dict:
         
     except Exception as e:
         log(f"❌ 错误: {str(e)}", "ERROR")
-        import traceback
         log(f"   {traceback.format_exc()}")
         return {
             "content": [{
@@ -1044,7 +1312,7 @@ async def _get_chatlog_stats_impl(args: dict) -> dict:
 
 
 async def _list_topics_impl(args: dict) -> dict:
-    started = time.time()
+    started = time.monotonic_ns()
     limit = min(int(args.get("limit", _CHATLOG_MAX_LIST_ITEMS)), _CHATLOG_MAX_LIST_ITEMS)
     pattern = (args.get("pattern") or "").strip()
 
@@ -1055,7 +1323,7 @@ async def _list_topics_impl(args: dict) -> dict:
             meta={
                 "available": False,
                 "source": "index",
-                "timing_ms": int((time.time() - started) * 1000)
+                "timing_ms": _elapsed_ms(started)
             },
             tool_name="list_topics"
         )
@@ -1082,13 +1350,13 @@ async def _list_topics_impl(args: dict) -> dict:
     meta = {
         "available": True,
         "source": "index",
-        "timing_ms": int((time.time() - started) * 1000),
+        "timing_ms": _elapsed_ms(started),
     }
     return _success(data, meta=meta, tool_name="list_topics")
 
 
 async def _search_by_topics_impl(args: dict) -> dict:
-    started = time.time()
+    started = time.monotonic_ns()
     topics = _coerce_list(args.get("topics"))
     max_results = min(int(args.get("max_results", _CHATLOG_MAX_LIST_ITEMS)), 500)
 
@@ -1106,7 +1374,7 @@ async def _search_by_topics_impl(args: dict) -> dict:
             meta={
                 "available": False,
                 "source": "index",
-                "timing_ms": int((time.time() - started) * 1000)
+                "timing_ms": _elapsed_ms(started)
             },
             tool_name="search_by_topics"
         )
@@ -1116,11 +1384,10 @@ async def _search_by_topics_impl(args: dict) -> dict:
     for topic in topics:
         lines = index_loader.search_by_topic_exact(topic)
         breakdown[topic] = len(lines)
-        all_lines.update(lines)
+        all_lines.update(lines.tolist())
 
-    line_numbers = sorted(all_lines)
     limited, omitted_count, next_cursor = _truncate_list(
-        line_numbers,
+        all_lines,
         max_results,
         cursor_prefix="topics"
     )
@@ -1134,13 +1401,13 @@ async def _search_by_topics_impl(args: dict) -> dict:
     meta = {
         "available": True,
         "source": "index",
-        "timing_ms": int((time.time() - started) * 1000),
+        "timing_ms": _elapsed_ms(started),
     }
     return _success(data, meta=meta, tool_name="search_by_topics")
 
 
 async def _search_by_keywords_impl(args: dict) -> dict:
-    started = time.time()
+    started = time.monotonic_ns()
     keywords = _coerce_list(args.get("keywords"))
     target_person = args.get("target_person")
     max_results = min(int(args.get("max_results", _CHATLOG_MAX_LIST_ITEMS)), 500)
@@ -1160,7 +1427,7 @@ async def _search_by_keywords_impl(args: dict) -> dict:
             meta={
                 "available": False,
                 "source": "scan",
-                "timing_ms": int((time.time() - started) * 1000)
+                "timing_ms": _elapsed_ms(started)
             },
             tool_name="search_by_keywords"
         )
@@ -1198,13 +1465,13 @@ async def _search_by_keywords_impl(args: dict) -> dict:
     meta = {
         "available": True,
         "source": "scan",
-        "timing_ms": int((time.time() - started) * 1000),
+        "timing_ms": _elapsed_ms(started),
     }
     return _success(data, meta=meta, tool_name="search_by_keywords")
 
 
 async def _load_messages_impl(args: dict) -> dict:
-    started = time.time()
+    started = time.monotonic_ns()
     line_numbers = _coerce_int_list(args.get("line_numbers"))
     context_before = min(
         int(args.get("context_before", _CHATLOG_LOAD_CONTEXT_BEFORE)),
@@ -1253,7 +1520,7 @@ async def _load_messages_impl(args: dict) -> dict:
             meta={
                 "available": False,
                 "source": "index",
-                "timing_ms": int((time.time() - started) * 1000)
+                "timing_ms": _elapsed_ms(started)
             },
             tool_name="load_messages"
         )
@@ -1273,11 +1540,11 @@ async def _load_messages_impl(args: dict) -> dict:
     normalized_fields = [f for f in fields if isinstance(f, str) and f.strip()]
     if "line" not in normalized_fields:
         normalized_fields.insert(0, "line")
+    keep_keys = frozenset(normalized_fields) | {"metadata"}
     for msg in limited_messages:
         raw = msg.get("content", "")
         sender, body = _parse_sender_content(raw)
-        if max_content_chars > 0 and len(body) > max_content_chars:
-            body = body[:max_content_chars] + "…"
+        body = _clip_content(body, max_content_chars)
         snippet = _build_snippet(body, snippet_chars)
         item = {
             "line": msg.get("line_number"),
@@ -1290,7 +1557,7 @@ async def _load_messages_impl(args: dict) -> dict:
             item["metadata"] = msg.get("metadata", {})
         if "topics" in msg:
             item["topics"] = msg.get("topics")
-        item = {k: v for k, v in item.items() if k in normalized_fields or k == "metadata"}
+        item = {k: v for k, v in item.items() if k in keep_keys}
         result.append(item)
 
     data = {
@@ -1308,13 +1575,13 @@ async def _load_messages_impl(args: dict) -> dict:
     meta = {
         "available": True,
         "source": "index",
-        "timing_ms": int((time.time() - started) * 1000),
+        "timing_ms": _elapsed_ms(started),
     }
     return _success(data, meta=meta, tool_name="load_messages")
 
 
 async def _expand_query_impl(args: dict) -> dict:
-    started = time.time()
+    started = time.monotonic_ns()
     question = args.get("question", "")
     target_person = args.get("target_person")
     use_llm = bool(args.get("use_llm", True))
@@ -1327,10 +1594,16 @@ async def _expand_query_impl(args: dict) -> dict:
         )
 
     index_loader = get_index_loader()
-    available_topics = index_loader.available_topics if index_loader.load_index() else []
-    # Only pass first 50 topics as preview to LLM to prevent token explosion
-    # Full available_topics list (1771+) would consume ~8k tokens
-    topics_preview = available_topics[:50] if available_topics else []
+    if index_loader.load_index():
+        available_topics = index_loader.available_topics
+        available_topic_set = index_loader.available_topics_set
+        # Only pass the cached topic preview to LLM to prevent token explosion
+        # Full available_topics list (1771+) would consume ~8k tokens
+        topics_preview = index_loader.available_topics_preview
+    else:
+        available_topics = []
+        available_topic_set = frozenset()
+        topics_preview = ()
 
     cleaner = _get_cleaner()
     poe_client = cleaner._get_poe_client()
@@ -1342,7 +1615,7 @@ async def _expand_query_impl(args: dict) -> dict:
         )
         # Server-side filtering: ensure LLM-suggested topics exist in available_topics
         llm_topics = metadata.get("topics", [])
-        metadata["topics"] = [t for t in llm_topics if t in available_topics]
+        metadata["topics"] = [t for t in llm_topics if isinstance(t, str) and t in available_topic_set]
         method = "llm"
         model = cleaner.config.model
         llm_used = True
@@ -1397,13 +1670,13 @@ async def _expand_query_impl(args: dict) -> dict:
         "source": "llm" if method == "llm" else "rule_based",
         "llm_used": llm_used,
         "model": model,
-        "timing_ms": int((time.time() - started) * 1000),
+        "timing_ms": _elapsed_ms(started),
     }
     return _success(data, meta=meta, tool_name="expand_query")
 
 
 async def _search_semantic_impl(args: dict) -> dict:
-    started = time.time()
+    started = time.monotonic_ns()
     query = args.get("query", "")
     top_k = min(int(args.get("top_k", _CHATLOG_MAX_LIST_ITEMS)), 200)
 
@@ -1425,7 +1698,7 @@ async def _search_semantic_impl(args: dict) -> dict:
         meta = {
             "available": False,
             "source": "semantic",
-            "timing_ms": int((time.time() - started) * 1000),
+            "timing_ms": _elapsed_ms(started),
         }
         return _success(data, meta=meta, tool_name="search_semantic")
 
@@ -1450,13 +1723,13 @@ async def _search_semantic_impl(args: dict) -> dict:
     meta = {
         "available": True,
         "source": "semantic",
-        "timing_ms": int((time.time() - started) * 1000),
+        "timing_ms": _elapsed_ms(started),
     }
     return _success(data, meta=meta, tool_name="search_semantic")
 
 
 async def _filter_by_person_impl(args: dict) -> dict:
-    started = time.time()
+    started = time.monotonic_ns()
     messages = args.get("messages") or []
     target_person = args.get("target_person", "")
     use_llm = bool(args.get("use_llm", True))
@@ -1504,7 +1777,7 @@ async def _filter_by_person_impl(args: dict) -> dict:
             "source": "llm",
             "llm_used": True,
             "model": cleaner.config.model,
-            "timing_ms": int((time.time() - started) * 1000),
+            "timing_ms": _elapsed_ms(started),
             "attr_stats": attr_stats,
         }
     else:
@@ -1521,7 +1794,7 @@ async def _filter_by_person_impl(args: dict) -> dict:
             "source": "rule_based",
             "llm_used": False,
             "model": None,
-            "timing_ms": int((time.time() - started) * 1000),
+            "timing_ms": _elapsed_ms(started),
         }
 
     data = {
@@ -1536,7 +1809,7 @@ async def _filter_by_person_impl(args: dict) -> dict:
 
 
 async def _format_messages_impl(args: dict) -> dict:
-    started = time.time()
+    started = time.monotonic_ns()
     messages = args.get("messages") or []
     fmt = args.get("format", "compact")
     max_chars = min(int(args.get("max_chars", _CHATLOG_MAX_RETURN_CHARS)), 10000)
@@ -1591,7 +1864,7 @@ async def _format_messages_impl(args: dict) -> dict:
     meta = {
         "available": True,
         "source": "format",
-        "timing_ms": int((time.time() - started) * 1000),
+        "timing_ms": _elapsed_ms(started),
     }
     return _success(data, meta=meta, tool_name="format_messages")
 
@@ -1618,7 +1891,7 @@ def _classify_signal(content: str) -> Tuple[bool, bool]:
 
 
 async def _parse_task_impl(args: dict) -> dict:
-    started = time.time()
+    started = time.monotonic_ns()
     question = args.get("question", "")
     target_person = args.get("target_person")
     use_llm = bool(args.get("use_llm", True))
@@ -1669,13 +1942,13 @@ async def _parse_task_impl(args: dict) -> dict:
     result_meta = {
         "available": True,
         "source": "parse",
-        "timing_ms": int((time.time() - started) * 1000),
+        "timing_ms": _elapsed_ms(started),
     }
     return _success(output, meta=result_meta, tool_name="parse_task")
 
 
 async def _retrieve_evidence_impl(args: dict) -> dict:
-    started = time.time()
+    started = time.monotonic_ns()
     question = args.get("question", "")
     target_person = args.get("target_person")
     dimensions = args.get("dimensions") or []
@@ -1718,6 +1991,7 @@ async def _retrieve_evidence_impl(args: dict) -> dict:
         )
 
     available_topics = index_loader.available_topics
+    available_topic_set = index_loader.available_topics_set
 
     if not dimensions:
         cleaner = _get_cleaner()
@@ -1751,65 +2025,101 @@ async def _retrieve_evidence_impl(args: dict) -> dict:
         meta = {
             "available": True,
             "source": "retrieve",
-            "timing_ms": int((time.time() - started) * 1000),
+            "timing_ms": _elapsed_ms(started),
         }
         return _success(data, meta=meta, tool_name="retrieve_evidence")
 
     semantic_index = get_semantic_index()
-    sem_weight = float(os.getenv("CHATLOG_SEM_WEIGHT", "0.6"))
-    kw_weight = float(os.getenv("CHATLOG_KW_WEIGHT", "0.4"))
-    weight_sum = sem_weight + kw_weight if (sem_weight + kw_weight) > 0 else 1.0
-    sem_weight /= weight_sum
-    kw_weight /= weight_sum
-    high_info_lines = set(index_loader.get_high_value_messages())
+    sem_weight, kw_weight = _CHATLOG_SEM_WEIGHT, _CHATLOG_KW_WEIGHT
+    high_info_array = index_loader.high_value_lines
 
-    evidence_store: List[Dict[str, Any]] = []
-    dimension_outputs: List[Dict[str, Any]] = []
-    remaining_budget = max_total_messages
+    sem_top_k = min(_CHATLOG_MAX_LIST_ITEMS, max_per_dimension * 4)
+    counter_top_k = min(_CHATLOG_MAX_LIST_ITEMS, max(5, int(max_per_dimension / 2)))
 
-    for dim in dimensions:
-        if remaining_budget <= 0:
-            break
-        name = dim.get("name") or "未命名维度"
-        intent = dim.get("intent") or ""
-        topic_seeds = _coerce_list(dim.get("topic_seeds"))
-        keyword_seeds = _coerce_list(dim.get("keyword_seeds"))
-        semantic_queries = _coerce_list(dim.get("semantic_queries"))
-        counter_queries = _coerce_list(dim.get("counter_queries"))
-        min_evidence = int(dim.get("min_evidence", 3))
+    plans = [
+        {
+            "name": dim.get("name") or "未命名维度",
+            "intent": dim.get("intent") or "",
+            "topic_seeds": [t for t in _coerce_list(dim.get("topic_seeds")) if t in available_topic_set],
+            "keyword_seeds": _coerce_list(dim.get("keyword_seeds")),
+            "semantic_queries": _coerce_list(dim.get("semantic_queries")),
+            "counter_queries": _coerce_list(dim.get("counter_queries")),
+            "min_evidence": int(dim.get("min_evidence", 3)),
+        }
+        for dim in dimensions
+    ]
+
+    # Every dimension's semantic and counter queries go out as one batch: one
+    # embedding request and one sweep over the embeddings, sliced per dimension
+    batch_queries = list(dict.fromkeys(
+        query
+        for plan in plans
+        for query in (*plan["semantic_queries"], *plan["counter_queries"])
+    ))
+    batch_rows: Dict[str, int] = {}
+    if use_semantic and batch_queries and semantic_index.is_available():
+        batch_lines, batch_sims = await asyncio.to_thread(
+            semantic_index.search_batch, batch_queries, max(sem_top_k, counter_top_k)
+        )
+        if batch_lines.size:
+            batch_rows = {query: row for row, query in enumerate(batch_queries)}
+
+    def _semantic_hits(queries: List[str], top_k: int) -> Dict[int, float]:
+        rows = [batch_rows[query] for query in queries if query in batch_rows]
+        if not rows:
+            return {}
+        return _merge_semantic_hits(batch_lines[rows, :top_k], batch_sims[rows, :top_k])
+
+    async def _recall_dimension(
+        plan: Dict[str, Any]
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[int, float], Dict[int, float]]:
+        # Recall does not depend on the shared message budget, so dimensions run concurrently
+        semantic_lines = _semantic_hits(plan["semantic_queries"], sem_top_k)
+        counter_lines = _semantic_hits(plan["counter_queries"], counter_top_k)
+        topic_lines = _unique_lines(
+            index_loader.search_by_topic_exact(topic) for topic in plan["topic_seeds"]
+        )
 
-        topic_seeds = [t for t in topic_seeds if t in available_topics]
-        topic_lines: Dict[int, int] = {}
-        for topic in topic_seeds:
-            for ln in index_loader.search_by_topic_exact(topic):
-                topic_lines[ln] = topic_lines.get(ln, 0) + 1
-
-        semantic_lines: Dict[int, float] = {}
-        if use_semantic and semantic_queries and semantic_index.is_available():
-            sem_top_k = min(_CHATLOG_MAX_LIST_ITEMS, max_per_dimension * 4)
-            for query in semantic_queries:
-                for line_num, score in semantic_index.search(query, top_k=sem_top_k):
-                    semantic_lines[line_num] = max(
-                        semantic_lines.get(line_num, 0.0),
-                        max(0.0, min(1.0, (score + 1.0) / 2.0)),
-                    )
-
-        keyword_lines: Dict[int, int] = {}
-        if keyword_seeds and not topic_lines and not semantic_lines:
+        keyword_lines = np.empty(0, dtype=np.int64)
+        if plan["keyword_seeds"] and not topic_lines.size and not semantic_lines:
             keyword_result = await _search_by_keywords_impl({
-                "keywords": keyword_seeds,
+                "keywords": plan["keyword_seeds"],
                 "target_person": target_person,
                 "max_results": _CHATLOG_MAX_LIST_ITEMS,
                 "match_all": False,
             })
             payload = _extract_payload(keyword_result)
             keyword_data = payload.get("data", {})
-            for ln in keyword_data.get("line_numbers", []) or []:
-                if isinstance(ln, int):
-                    keyword_lines[ln] = keyword_lines.get(ln, 0) + 1
+            keyword_lines = _unique_lines([
+                [ln for ln in keyword_data.get("line_numbers", []) or [] if isinstance(ln, int)]
+            ])
+
+        matched_lines = np.union1d(topic_lines, keyword_lines)
+        candidate_lines = np.union1d(
+            matched_lines,
+            np.fromiter(semantic_lines.keys(), dtype=np.int64, count=len(semantic_lines)),
+        )
+        return matched_lines, candidate_lines, semantic_lines, counter_lines
+
+    recalls = await asyncio.gather(*(_recall_dimension(plan) for plan in plans))
+
+    evidence_store: List[Dict[str, Any]] = []
+    dimension_outputs: List[Dict[str, Any]] = []
+    remaining_budget = max_total_messages
 
-        combined_lines = set(topic_lines.keys()) | set(keyword_lines.keys()) | set(semantic_lines.keys())
-        if not combined_lines:
+    # Selection consumes the budget dimension by dimension, in plan order
+    for plan, (matched_lines, candidate_lines, semantic_lines, counter_lines) in zip(plans, recalls):
+        if remaining_budget <= 0:
+            break
+        name = plan["name"]
+        intent = plan["intent"]
+        topic_seeds = plan["topic_seeds"]
+        keyword_seeds = plan["keyword_seeds"]
+        semantic_queries = plan["semantic_queries"]
+        counter_queries = plan["counter_queries"]
+        min_evidence = plan["min_evidence"]
+
+        if not candidate_lines.size:
             dimension_outputs.append({
                 "name": name,
                 "intent": intent,
@@ -1827,20 +2137,20 @@ async def _retrieve_evidence_impl(args: dict) -> dict:
             })
             continue
 
-        def _score(line_num: int) -> float:
-            score = 0.0
-            if line_num in topic_lines or line_num in keyword_lines:
-                score += kw_weight
-            if line_num in semantic_lines:
-                score += sem_weight * semantic_lines[line_num]
-            if line_num in high_info_lines:
-                score += 0.15
-            return score
-
-        ranked_lines = sorted(combined_lines, key=lambda ln: (_score(ln), -ln), reverse=True)
+        candidate_scores = _score_lines(
+            candidate_lines,
+            matched_lines,
+            semantic_lines,
+            high_info_array,
+            kw_weight,
+            sem_weight,
+        )
         desired = min(max_per_dimension, remaining_budget)
-        selected_lines = ranked_lines[:desired]
-        omitted_count = max(0, len(combined_lines) - len(selected_lines))
+        top_idx = _top_k_indices(candidate_lines, candidate_scores, desired)
+        selected_array = candidate_lines[top_idx]
+        selected_lines = selected_array.tolist()
+        score_by_line = dict(zip(selected_lines, candidate_scores[top_idx].tolist()))
+        omitted_count = max(0, candidate_lines.size - len(selected_lines))
 
         messages = index_loader.get_messages_by_lines(
             selected_lines,
@@ -1853,14 +2163,9 @@ async def _retrieve_evidence_impl(args: dict) -> dict:
                 continue
             raw = msg.get("content", "")
             sender, body = _parse_sender_content(raw)
-            full_content = body
-            if _CHATLOG_MAX_CONTENT_CHARS > 0 and len(full_content) > _CHATLOG_MAX_CONTENT_CHARS:
-                full_content = full_content[:_CHATLOG_MAX_CONTENT_CHARS] + "…"
+            full_content = _clip_content(body, _CHATLOG_MAX_CONTENT_CHARS)
             snippet = _build_snippet(full_content, snippet_chars)
-            mentions_target = False
-            if target_person:
-                mentions_target = target_person in (sender or "") or target_person in full_content
-            score = _score(msg.get("line_number", 0))
+            score = score_by_line.get(msg.get("line_number"), 0.0)
             formatted_messages.append({
                 "line": msg.get("line_number"),
                 "time": (msg.get("timestamp") or "")[:19],
@@ -1868,10 +2173,9 @@ async def _retrieve_evidence_impl(args: dict) -> dict:
                 "content": full_content,
                 "snippet": snippet,
                 "topics": msg.get("topics", []),
-                "metadata": msg.get("metadata", {}),
                 "score": round(score, 4),
                 "dimension": name,
-                "mentions_target": mentions_target,
+                "mentions_target": _mentions_target(target_person, sender, full_content),
                 "is_counter": False,
             })
 
@@ -1881,19 +2185,14 @@ async def _retrieve_evidence_impl(args: dict) -> dict:
 
         counter_evidence: List[Dict[str, Any]] = []
         counter_store: List[Dict[str, Any]] = []
-        if use_semantic and counter_queries and semantic_index.is_available():
-            counter_lines: Dict[int, float] = {}
-            counter_top_k = min(_CHATLOG_MAX_LIST_ITEMS, max(5, int(max_per_dimension / 2)))
-            for query in counter_queries:
-                for line_num, score in semantic_index.search(query, top_k=counter_top_k):
-                    counter_lines[line_num] = max(
-                        counter_lines.get(line_num, 0.0),
-                        max(0.0, min(1.0, (score + 1.0) / 2.0)),
-                    )
-            counter_candidates = [ln for ln in counter_lines.keys() if ln not in selected_lines]
+        if counter_lines:
+            counter_line_arr = np.fromiter(counter_lines.keys(), dtype=np.int64, count=len(counter_lines))
+            counter_candidates = counter_line_arr[
+                ~np.isin(counter_line_arr, selected_array)
+            ][:counter_top_k].tolist()
             if counter_candidates:
                 counter_messages = index_loader.get_messages_by_lines(
-                    counter_candidates[:counter_top_k],
+                    counter_candidates,
                     context_before=0,
                     context_after=0,
                 )
@@ -1902,34 +2201,23 @@ async def _retrieve_evidence_impl(args: dict) -> dict:
                         continue
                     raw = msg.get("content", "")
                     sender, body = _parse_sender_content(raw)
-                    full_content = body
-                    if _CHATLOG_MAX_CONTENT_CHARS > 0 and len(full_content) > _CHATLOG_MAX_CONTENT_CHARS:
-                        full_content = full_content[:_CHATLOG_MAX_CONTENT_CHARS] + "…"
-                    snippet = _build_snippet(full_content, snippet_chars)
+                    full_content = _clip_content(body, _CHATLOG_MAX_CONTENT_CHARS)
                     counter_store.append({
                         "line": msg.get("line_number"),
                         "time": (msg.get("timestamp") or "")[:19],
                         "sender": sender or "未知",
                         "content": full_content,
-                        "snippet": snippet,
+                        "snippet": _build_snippet(full_content, snippet_chars),
                         "topics": msg.get("topics", []),
-                        "metadata": msg.get("metadata", {}),
                         "score": round(counter_lines.get(msg.get("line_number"), 0.0), 4),
                         "dimension": name,
-                        "mentions_target": (
-                            target_person in (sender or "") or target_person in full_content
-                        ) if target_person else False,
-                        "is_counter": True,
-                    })
-                    counter_evidence.append({
-                        "line": msg.get("line_number"),
-                        "time": (msg.get("timestamp") or "")[:19],
-                        "sender": sender or "未知",
-                        "snippet": snippet,
-                        "score": round(counter_lines.get(msg.get("line_number"), 0.0), 4),
+                        "mentions_target": _mentions_target(target_person, sender, full_content),
                         "is_counter": True,
                     })
-            counter_evidence = counter_evidence[:max(1, int(max_per_dimension / 3))]
+            counter_evidence = _project_records(
+                counter_store[:max(1, int(max_per_dimension / 3))],
+                _COUNTER_VIEW_FIELDS,
+            )
 
         evidence_store.extend(formatted_messages)
         evidence_store.extend(counter_store)
@@ -1937,17 +2225,7 @@ async def _retrieve_evidence_impl(args: dict) -> dict:
         dimension_outputs.append({
             "name": name,
             "intent": intent,
-            "evidence": [
-                {
-                    "line": m.get("line"),
-                    "time": m.get("time"),
-                    "sender": m.get("sender"),
-                    "snippet": m.get("snippet"),
-                    "topics": m.get("topics", []),
-                    "score": m.get("score"),
-                }
-                for m in formatted_messages
-            ],
+            "evidence": _project_records(formatted_messages, _EVIDENCE_VIEW_FIELDS),
             "counter_evidence": counter_evidence,
             "coverage": {
                 "topic_seeds": topic_seeds,
@@ -1974,9 +2252,9 @@ async def _retrieve_evidence_impl(args: dict) -> dict:
                     max_output_messages=max_total_messages,
                     compression_ratio=0.5,
                 )
-                print(f"[RETRIEVE] ✓ 智能压缩: {len(evidence_store)} 条消息")
+                _logger.info("[RETRIEVE] ✓ 智能压缩: %d 条消息", len(evidence_store))
             except Exception as e:
-                print(f"[RETRIEVE] 压缩失败, 使用原始数据: {e}")
+                _logger.warning("[RETRIEVE] 压缩失败, 使用原始数据: %s", e)
 
     evidence_id = _store_evidence({
         "question": question,
@@ -2002,13 +2280,13 @@ async def _retrieve_evidence_impl(args: dict) -> dict:
     meta = {
         "available": True,
         "source": "retrieve",
-        "timing_ms": int((time.time() - started) * 1000),
+        "timing_ms": _elapsed_ms(started),
     }
     return _success(data, meta=meta, tool_name="retrieve_evidence")
 
 
 async def _analyze_evidence_impl(args: dict) -> dict:
-    started = time.time()
+    started = time.monotonic_ns()
     evidence_id = args.get("evidence_id")
     messages = args.get("messages") or []
     question = args.get("question", "")
@@ -2042,23 +2320,31 @@ async def _analyze_evidence_impl(args: dict) -> dict:
             msg.setdefault("dimension", "综合证据")
 
     matrix: List[Dict[str, Any]] = []
-    sender_counts: Dict[str, int] = {}
+    sender_counts: Dict[str, int] = dict(Counter(msg.get("sender", "未知") for msg in messages))
+
+    # Bucket messages by (dimension, is_counter) once instead of rescanning per dimension
+    buckets: Dict[Tuple[Any, bool], List[Dict[str, Any]]] = {}
     for msg in messages:
-        sender = msg.get("sender", "未知")
-        sender_counts[sender] = sender_counts.get(sender, 0) + 1
+        buckets.setdefault((msg.get("dimension"), bool(msg.get("is_counter"))), []).append(msg)
 
     for dim in dimensions:
         name = dim.get("name") or "未命名维度"
         intent = dim.get("intent") or ""
         min_evidence = int(dim.get("min_evidence", 3))
-        dim_messages = [m for m in messages if m.get("dimension") == name and not m.get("is_counter")]
-        counter_messages = [m for m in messages if m.get("dimension") == name and m.get("is_counter")]
-
-        dim_messages.sort(key=lambda m: (m.get("mentions_target"), m.get("score", 0)), reverse=True)
-        counter_messages.sort(key=lambda m: m.get("score", 0), reverse=True)
-
-        selected = dim_messages[:max_examples]
-        counter_selected = counter_messages[:max(1, int(max_examples / 2))] if counter_messages else []
+        dim_messages = buckets.get((name, False), [])
+        counter_messages = buckets.get((name, True), [])
+
+        # nlargest keeps the stable order of sorted(..., reverse=True)[:n] without a full sort
+        selected = heapq.nlargest(
+            max_examples,
+            dim_messages,
+            key=lambda m: (m.get("mentions_target"), m.get("score", 0)),
+        )
+        counter_selected = heapq.nlargest(
+            max(1, int(max_examples / 2)),
+            counter_messages,
+            key=lambda m: m.get("score", 0),
+        )
 
         topics_seen: List[str] = []
         for msg in selected:
@@ -2142,7 +2428,7 @@ async def _analyze_evidence_impl(args: dict) -> dict:
                             if llm_dim.get("confidence"):
                                 m["confidence"] = llm_dim.get("confidence")
             except Exception as e:
-                print(f"[ANALYZE] LLM matrix generation failed: {e}")
+                _logger.warning("[ANALYZE] LLM matrix generation failed: %s", e)
 
     data = {
         "evidence_id": evidence_id,
@@ -2162,13 +2448,14 @@ async def _analyze_evidence_impl(args: dict) -> dict:
         "available": True,
         "source": "analysis",
         "llm_used": bool(llm_matrix and llm_matrix.get("method") == "llm"),
-        "timing_ms": int((time.time() - started) * 1000),
+        "timing_ms": _elapsed_ms(started),
     }
     return _success(data, meta=meta, tool_name="analyze_evidence")
 
 
 async def _search_person_impl(args: dict) -> dict:
     """Internal implementation of search_person."""
+    started = time.monotonic_ns()
     person = args.get("person", "")
     include_context = bool(args.get("include_context", False))
     max_messages = min(int(args.get("max_messages", _CHATLOG_MAX_LIST_ITEMS)), 200)
@@ -2204,17 +2491,17 @@ async def _search_person_impl(args: dict) -> dict:
                 "omitted_count": 0,
                 "next_cursor": None,
             },
-            meta={"source": "search_person", "available": True},
+            meta={"source": "search_person", "available": True, "timing_ms": _elapsed_ms(started)},
             tool_name="search_person"
         )
 
     line_numbers: List[int] = []
     if include_context:
-        line_set = set()
-        for msg in person_messages[:max_messages]:
-            for ln in range(max(1, msg.line_number - context_before), msg.line_number + context_after + 1):
-                line_set.add(ln)
-        line_numbers = sorted(line_set)
+        line_numbers = _window_lines(
+            (msg.line_number for msg in person_messages[:max_messages]),
+            context_before,
+            context_after,
+        ).tolist()
     else:
         line_numbers = [msg.line_number for msg in person_messages[:max_messages]]
 
@@ -2248,6 +2535,7 @@ async def _search_person_impl(args: dict) -> dict:
     meta = {
         "available": True,
         "source": "search_person",
+        "timing_ms": _elapsed_ms(started),
     }
     return _success(data, meta=meta, tool_name="search_person")
 
@@ -2438,6 +2726,33 @@ async def analyze_evidence(args: dict) -> dict:
 # MCP Server Creation
 # ═══════════════════════════════════════════════════════════════════════════════
 
+_warm_up_started = False
+_warm_up_lock = threading.Lock()
+
+
+def _start_warm_up() -> None:
+    """
+    Load the metadata and embeddings indexes in the background so the first query finds them ready.
+
+    Runs once per process; later server creations (TUI reconnects) reuse the loaded indexes.
+    """
+    global _warm_up_started
+    with _warm_up_lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+
+    # Create the singletons here, not in the thread, so a racing first query shares them
+    index_loader = get_index_loader()
+    semantic_index = get_semantic_index()
+
+    def _warm() -> None:
+        index_loader.load_index()
+        semantic_index.load()
+
+    threading.Thread(target=_warm, name="chatlog-warm-up", daemon=True).start()
+
+
 def create_chatlog_mcp_server(chatlog_path: Optional[str] = None):
     """
     Create the Chatlog MCP server.
@@ -2475,6 +2790,9 @@ def create_chatlog_mcp_server(chatlog_path: Optional[str] = None):
     else:
         tools = core_tools
 
+    if os.getenv("CHATLOG_WARM_START", "1") == "1":
+        _start_warm_up()
+
     return create_sdk_mcp_server(
         name="chatlog",
         version="1.0.0",
@@ -2567,8 +2885,10 @@ def get_chatlog_tools_info() -> List[Dict[str, str]]:
 
 
 async def close_chatlog_clients() -> None:
-    """Close any chatlog-related async clients (e.g., Poe session)."""
+    """Close any chatlog-related async clients (e.g., Poe session) and unmap the index files."""
     global _chatlog_cleaner
+    # Mapped files cannot be replaced on Windows, which would block rebuilding the index
+    get_index_loader().close()
     if _chatlog_cleaner is None:
         return
     try:
@@ -2582,6 +2902,33 @@ async def close_chatlog_clients() -> None:
 # Synchronous API for direct usage
 # ═══════════════════════════════════════════════════════════════════════════════
 
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    """
+    Background event loop shared by the *_sync wrappers, started on first use.
+
+    Runs forever on a daemon thread (uvloop when installed), so the wrappers work
+    even when called from a thread that already has a running loop. The shared
+    Poe client belongs to the loop that first used it, so code running on an
+    event loop (such as the TUI) awaits the *_async variants instead.
+    """
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None or _sync_loop.is_closed():
+            loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="chatlog-sync-loop", daemon=True).start()
+            _sync_loop = loop
+    return _sync_loop
+
+
+def _run_sync(coro: Any) -> Any:
+    """Run a coroutine on the background loop and block until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_sync_loop()).result()
+
+
 def compose_chatlog_query_sync(
     question: str,
     target_person: Optional[str] = None,
@@ -2594,13 +2941,7 @@ def compose_chatlog_query_sync(
         "max_results": max_results
     }
     
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    
-    result = loop.run_until_complete(_query_chatlog_composed_impl(args))
+    result = _run_sync(_query_chatlog_composed_impl(args))
     
     # Extract text from result
     if "content" in result and result["content"]:
@@ -2608,46 +2949,55 @@ def compose_chatlog_query_sync(
     return str(result)
 
 
-def compose_chatlog_analysis_sync(
-    question: str,
-    target_person: Optional[str] = None,
-    max_dimensions: int = 4
-) -> str:
-    """Synchronous wrapper for the parse->retrieve->analyze flow."""
-    args = {
-        "question": question,
-        "target_person": target_person,
-        "max_dimensions": max_dimensions,
-    }
+async def _compose_analysis_pipeline(args: dict) -> Tuple[Optional[str], Dict[str, Any]]:
+    """
+    Run parse -> retrieve -> analyze in one coroutine.
 
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    Each step needs the previous step's output, so the only overlap is loading the
+    semantic embeddings in a worker thread while the dimension plan is drafted.
+    """
+    question = args.get("question", "")
+    target_person = args.get("target_person")
+    semantic_warmup = asyncio.create_task(asyncio.to_thread(get_semantic_index().load))
 
-    parse_result = loop.run_until_complete(_parse_task_impl(args))
+    parse_result = await _parse_task_impl(args)
     parse_payload = _extract_payload(parse_result)
     parse_data = parse_payload.get("data", {})
     dimensions = parse_data.get("dimensions", []) or []
 
-    retrieve_result = loop.run_until_complete(_retrieve_evidence_impl({
+    await semantic_warmup
+    retrieve_result = await _retrieve_evidence_impl({
         "question": question,
         "target_person": target_person,
         "dimensions": dimensions,
-    }))
+    })
     retrieve_payload = _extract_payload(retrieve_result)
     retrieve_data = retrieve_payload.get("data", {})
     evidence_id = retrieve_data.get("evidence_id")
 
-    analyze_result = loop.run_until_complete(_analyze_evidence_impl({
+    analyze_result = await _analyze_evidence_impl({
         "evidence_id": evidence_id,
         "question": question,
         "target_person": target_person,
         "dimensions": dimensions,
-    }))
+    })
     analyze_payload = _extract_payload(analyze_result)
-    analyze_data = analyze_payload.get("data", {})
+    return evidence_id, analyze_payload.get("data", {})
+
+
+async def compose_chatlog_analysis_async(
+    question: str,
+    target_person: Optional[str] = None,
+    max_dimensions: int = 4
+) -> str:
+    """Run the parse->retrieve->analyze flow on the caller's loop and render it as Markdown."""
+    args = {
+        "question": question,
+        "target_person": target_person,
+        "max_dimensions": max_dimensions,
+    }
+
+    evidence_id, analyze_data = await _compose_analysis_pipeline(args)
 
     lines: List[str] = []
     lines.append("## 证据分析")
@@ -2690,18 +3040,26 @@ def compose_chatlog_analysis_sync(
     return "\n".join(lines).strip()
 
 
-def get_chatlog_stats_sync() -> str:
-    """Synchronous wrapper for get_chatlog_stats."""
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    
-    result = loop.run_until_complete(_get_chatlog_stats_impl({}))
+def compose_chatlog_analysis_sync(
+    question: str,
+    target_person: Optional[str] = None,
+    max_dimensions: int = 4
+) -> str:
+    """Synchronous wrapper for compose_chatlog_analysis_async (for scripts)."""
+    return _run_sync(compose_chatlog_analysis_async(question, target_person, max_dimensions))
+
+
+async def get_chatlog_stats_async() -> str:
+    """Chatlog statistics text, computed on the caller's loop."""
+    result = await _get_chatlog_stats_impl({})
     
     # Extract text from result
     if "content" in result and result["content"]:
         return result["content"][0].get("text", "")
     return str(result)
 
+
+def get_chatlog_stats_sync() -> str:
+    """Synchronous wrapper for get_chatlog_stats_async (for scripts)."""
+    return _run_sync(get_chatlog_stats_async())
+
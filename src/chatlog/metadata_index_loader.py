@@ -1,12 +1,259 @@
 """
 Metadata Index Loader - Fast O(1) topic-based search
 
-Uses pre-built inverted index for efficient topic matching.
+Uses pre-built inverted index for efficient topic matching. Prefers the
+memory-mapped binary index written by MetadataIndexer, so startup does not
+parse the whole JSON and each index kind's compressed postings are decoded
+into uint32 arrays only when that kind is first searched.
 """
 
 import os
 import json
-from typing import Dict, List, Set, Any, Optional
+import mmap
+import struct
+import sys
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, BinaryIO, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .metadata_indexer import (
+    BINARY_INDEX_MAGIC,
+    POSTINGS_DTYPE,
+    binary_index_path,
+    decode_postings,
+    json_loads,
+    suffix_order,
+)
+
+
+# Number of topics shown to the LLM as a hint (full list would cost ~8k tokens)
+TOPICS_PREVIEW_SIZE = 50
+
+# Edit-distance topic search: larger distances match nearly every short topic
+MAX_TOPIC_EDIT_DISTANCE = 2
+EDIT_SEARCH_CACHE_SIZE = 256
+
+# Multi-topic union/AND results kept per distinct query (recurring profiles repeat them)
+COMBINED_SEARCH_CACHE_SIZE = 256
+
+# Block size for scanning the chatlog when no line offsets are available
+SCAN_BLOCK_SIZE = 1 << 20
+
+# Shared result for keys missing from an index
+_NO_LINES = np.empty(0, dtype=POSTINGS_DTYPE)
+_NO_LINES.setflags(write=False)
+
+
+class _PostingsTable(Mapping):
+    """
+    All posting lists of one index kind in a single read-only uint32 pool.
+
+    Key i owns pool[bounds[i]:bounds[i + 1]]; lookups slice a view on demand,
+    so a key costs one dict slot instead of its own array object.
+    """
+
+    __slots__ = ("_slots", "_pool", "_bounds")
+
+    def __init__(self, keys: List[str], pool: np.ndarray, bounds: List[int]):
+        pool.setflags(write=False)
+        self._slots = {sys.intern(key): i for i, key in enumerate(keys)}
+        self._pool = pool
+        self._bounds = bounds
+
+    @classmethod
+    def from_lists(cls, index: Dict[str, List[int]]) -> "_PostingsTable":
+        counts = [len(lines) for lines in index.values()]
+        bounds = [0]
+        for count in counts:
+            bounds.append(bounds[-1] + count)
+        pool = np.fromiter(
+            (line_num for lines in index.values() for line_num in lines),
+            dtype=POSTINGS_DTYPE,
+            count=bounds[-1],
+        )
+        return cls(list(index), pool, bounds)
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        i = self._slots[key]
+        return self._pool[self._bounds[i]:self._bounds[i + 1]]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        i = self._slots.get(key)
+        if i is None:
+            return default
+        return self._pool[self._bounds[i]:self._bounds[i + 1]]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._slots
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._slots)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+
+_EMPTY_TABLE = _PostingsTable([], _NO_LINES.copy(), [0])
+
+
+def _close_mapping(mapped: Optional[mmap.mmap]) -> None:
+    """Close a mapping unless a caller still holds a view of it; then it closes once collected."""
+    if mapped is None:
+        return
+    try:
+        mapped.close()
+    except BufferError:
+        pass
+
+
+def _union_postings(postings: List[np.ndarray]) -> np.ndarray:
+    """Sorted union of posting arrays in one C-level sort instead of per-line set inserts."""
+    if not postings:
+        return _NO_LINES
+    return np.unique(np.concatenate(postings))
+
+
+def _intersect_postings(postings: List[np.ndarray]) -> np.ndarray:
+    """
+    Sorted intersection of posting arrays, shortest first so each step shrinks quickly.
+
+    Postings are sorted and unique, so each step binary-searches the surviving
+    lines in the next array (O(m log n)) instead of sorting both together.
+    """
+    if not postings:
+        return _NO_LINES
+    ordered = sorted(postings, key=len)
+    result = ordered[0]
+    for lines in ordered[1:]:
+        if not result.size:
+            break
+        pos = np.searchsorted(lines, result)
+        hits = pos < lines.size
+        hits[hits] = lines[pos[hits]] == result[hits]
+        result = result[hits]
+    return result
+
+
+def _read_target_lines(f: BinaryIO, targets: List[int]) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (line number, raw line) for each of the sorted, 1-based targets in f.
+
+    Reads SCAN_BLOCK_SIZE blocks and splits them in C; only the targeted
+    lines are touched from Python. Line breaks follow text mode's universal
+    newlines (\\n, \\r\\n or a lone \\r), and reading stops after the last target.
+    """
+    i = 0
+    line_num = 0
+    carry = b""
+    while i < len(targets):
+        block = f.read(SCAN_BLOCK_SIZE)
+        if not block:
+            if carry and targets[i] == line_num + 1:
+                yield targets[i], carry
+            return
+        while block.endswith(b"\r"):
+            # Keep a \r\n pair in one block
+            extra = f.read(1)
+            if not extra:
+                break
+            block += extra
+        if b"\r" in block:
+            block = block.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        lines = block.split(b"\n")
+        lines[0] = carry + lines[0]
+        carry = lines.pop()
+        last_line = line_num + len(lines)
+        while i < len(targets) and targets[i] <= last_line:
+            yield targets[i], lines[targets[i] - line_num - 1]
+            i += 1
+        line_num = last_line
+
+
+class _SubstringIndex:
+    """
+    Sorted suffixes of lowercased names, so a substring query is a prefix range.
+
+    Finding the names that contain a query costs a bisect plus one step per
+    matching suffix instead of a lower() and a scan of every name. Suffixes
+    are kept as (name position, start) pairs, either sorted here or read
+    from the binary index.
+    """
+
+    __slots__ = ("names", "_lowered", "_positions", "_starts")
+
+    def __init__(
+        self,
+        names: List[str],
+        lowered: List[str],
+        order: Optional[Tuple[Any, Any]] = None,
+    ):
+        self.names = names
+        self._lowered = lowered
+        self._positions, self._starts = order if order is not None else suffix_order(lowered)
+
+    def positions(self, query_lower: str) -> List[int]:
+        """Ascending positions of the names whose lowercase form contains query_lower."""
+        if not query_lower:
+            return list(range(len(self.names)))
+        found = set()
+        lowered, positions, starts = self._lowered, self._positions, self._starts
+        i = bisect_left(
+            range(len(positions)),
+            query_lower,
+            key=lambda j: lowered[positions[j]][starts[j]:],
+        )
+        while i < len(positions) and lowered[positions[i]].startswith(query_lower, starts[i]):
+            found.add(int(positions[i]))
+            i += 1
+        return sorted(found)
+
+
+class _TopicTrie:
+    """Character trie over lowercased topic names for edit-distance lookups."""
+
+    __slots__ = ("_root",)
+
+    # Node key holding the original names that end at a node
+    _END = ""
+
+    def __init__(self, names: List[str], lowered: List[str]):
+        self._root: Dict[str, Any] = {}
+        for name, lower_name in zip(names, lowered):
+            node = self._root
+            for char in lower_name:
+                node = node.setdefault(char, {})
+            node.setdefault(self._END, []).append(name)
+
+    def within(self, query_lower: str, max_dist: int) -> List[str]:
+        """
+        Names whose lowercase form is within max_dist edits of query_lower.
+
+        Walks the trie carrying one Levenshtein DP row per node and prunes a
+        subtree as soon as the smallest entry of its row exceeds max_dist.
+        """
+        found: List[str] = []
+        first_row = list(range(len(query_lower) + 1))
+        stack = [(child, char, first_row) for char, child in self._root.items() if char != self._END]
+        if first_row[-1] <= max_dist:
+            found.extend(self._root.get(self._END, ()))
+        while stack:
+            node, char, prev_row = stack.pop()
+            row = [prev_row[0] + 1]
+            for col, query_char in enumerate(query_lower, 1):
+                row.append(min(
+                    row[col - 1] + 1,
+                    prev_row[col] + 1,
+                    prev_row[col - 1] + (query_char != char),
+                ))
+            if row[-1] <= max_dist:
+                found.extend(node.get(self._END, ()))
+            if min(row) <= max_dist:
+                stack.extend((child, next_char, row) for next_char, child in node.items() if next_char != self._END)
+        return found
 
 
 class MetadataIndexLoader:
@@ -37,20 +284,36 @@ class MetadataIndexLoader:
             chatlog_path = os.path.join(base_dir, "cleaned_chatlog.jsonl")
         
         self.index_path = index_path
+        self.binary_index_path = binary_index_path(index_path)
         self.chatlog_path = chatlog_path
         
-        # Index data
-        self._topic_index: Dict[str, List[int]] = {}
-        self._sentiment_index: Dict[str, List[int]] = {}
-        self._fact_keys_index: Dict[str, List[int]] = {}
-        self._info_density_index: Dict[str, List[int]] = {}
+        # Index kind ("topic", "sentiment", "fact_keys", "info_density") -> key -> postings;
+        # postings are sorted, read-only uint32 arrays. Binary kinds are decoded on first use.
+        self._indexes: Dict[str, _PostingsTable] = {}
+        # Parsed JSON posting lists per kind, converted to arrays by _index on first use
+        self._json_postings: Dict[str, Dict[str, List[int]]] = {}
+        self._index_mm: Optional[mmap.mmap] = None
+        self._chatlog_mm: Optional[mmap.mmap] = None
+        self._index_header: Dict[str, Any] = {}
+        self._index_sections: Dict[str, List[Any]] = {}
+        self._index_base = 0
         self._available_topics: List[str] = []
+        self._available_topics_preview: Tuple[str, ...] = ()
+        self._available_topics_set: FrozenSet[str] = frozenset()
+        self._high_value_lines: Optional[np.ndarray] = None
+        self._substring_indexes: Dict[str, _SubstringIndex] = {}
+        self._lowered: Dict[str, str] = {}
+        self._topic_trie: Optional[_TopicTrie] = None
+        self._edit_cache: "OrderedDict[Tuple[str, int], List[int]]" = OrderedDict()
+        self._combined_cache: "OrderedDict[Tuple[Any, ...], np.ndarray]" = OrderedDict()
         self._line_count: int = 0
         self._loaded = False
+        # Serializes loads so the warm-up thread and a first query parse or map the index once
+        self._load_lock = threading.Lock()
     
     def load_index(self) -> bool:
         """
-        Load pre-built index from JSON file.
+        Load pre-built index, memory-mapping the binary twin when it is current.
         
         Returns:
             True if successful, False otherwise.
@@ -58,22 +321,34 @@ class MetadataIndexLoader:
         if self._loaded:
             return True
         
+        with self._load_lock:
+            if self._loaded:
+                return True
+            return self._load_index_locked()
+
+    def _load_index_locked(self) -> bool:
+        """Load the binary or JSON index; the caller holds _load_lock."""
+        if self._binary_index_is_current() and self._load_binary_index():
+            return True
+        
         if not os.path.exists(self.index_path):
             print(f"[INDEX] Index file not found: {self.index_path}")
             print("[INDEX] Run metadata_indexer.py to generate it")
             return False
         
         try:
-            with open(self.index_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(self.index_path, 'rb') as f:
+                data = json_loads(f.read())
             
-            self._topic_index = data.get("topic_index", {})
-            self._sentiment_index = data.get("sentiment_index", {})
-            self._fact_keys_index = data.get("fact_keys_index", {})
-            self._info_density_index = data.get("info_density_index", {})
-            self._available_topics = data.get("available_topics", [])
-            self._line_count = data.get("line_count", 0)
-            self._loaded = True
+            self._set_index(
+                {},
+                data.get("available_topics", []),
+                data.get("line_count", 0),
+                json_postings={
+                    kind: data.get(f"{kind}_index", {})
+                    for kind in ("topic", "sentiment", "fact_keys", "info_density")
+                },
+            )
             
             print(f"[INDEX] Loaded index: {len(self._available_topics)} topics, {self._line_count} messages")
             return True
@@ -81,6 +356,97 @@ class MetadataIndexLoader:
         except Exception as e:
             print(f"[INDEX] Error loading index: {e}")
             return False
+
+    def _binary_index_is_current(self) -> bool:
+        """The binary index exists and is not older than the JSON it mirrors."""
+        if not os.path.exists(self.binary_index_path):
+            return False
+        if not os.path.exists(self.index_path):
+            return True
+        return os.path.getmtime(self.binary_index_path) >= os.path.getmtime(self.index_path)
+
+    def _load_binary_index(self) -> bool:
+        """Map the binary index read-only and slice postings straight out of the mapping."""
+        try:
+            with open(self.binary_index_path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if mm[:len(BINARY_INDEX_MAGIC)] != BINARY_INDEX_MAGIC:
+                mm.close()
+                print(f"[INDEX] Unrecognized binary index format, falling back to JSON: {self.binary_index_path}")
+                return False
+            header_start = len(BINARY_INDEX_MAGIC) + 8
+            (header_len,) = struct.unpack_from("<Q", mm, len(BINARY_INDEX_MAGIC))
+            header = json_loads(mm[header_start:header_start + header_len])
+
+            self._index_mm = mm
+            self._index_header = header
+            self._index_sections = header["sections"]
+            self._index_base = header_start + header_len
+            self._set_index({}, header["available_topics"], header["line_count"])
+
+            print(
+                f"[INDEX] Loaded binary index: {len(self._available_topics)} topics, "
+                f"{self._line_count} messages"
+            )
+            return True
+
+        except Exception as e:
+            print(f"[INDEX] Error loading binary index: {e}")
+            return False
+
+    def _section(self, name: str) -> np.ndarray:
+        offset, dtype, count = self._index_sections[name]
+        return np.frombuffer(
+            self._index_mm, dtype=dtype, count=count, offset=self._index_base + offset
+        )
+
+    def _index(self, kind: str) -> _PostingsTable:
+        """Postings by key for one index kind, converted from the binary or JSON index on first use."""
+        indexes, json_postings = self._indexes, self._json_postings
+        index = indexes.get(kind)
+        if index is None:
+            if kind in json_postings:
+                index = _PostingsTable.from_lists(json_postings[kind])
+            elif self._index_mm is not None and f"{kind}.keys" in self._index_sections:
+                bounds = self._section(f"{kind}.bounds")
+                index = _PostingsTable(
+                    json_loads(self._section(f"{kind}.keys").tobytes()),
+                    decode_postings(self._section(f"{kind}.pool"), bounds),
+                    bounds.tolist(),
+                )
+            else:
+                # Not cached: the kind's postings may still arrive with a load in progress
+                return _EMPTY_TABLE
+            indexes[kind] = index
+            # Dropped only once converted, so a concurrent lookup never sees neither form
+            json_postings.pop(kind, None)
+        return index
+
+    def _set_index(
+        self,
+        indexes: Dict[str, _PostingsTable],
+        available_topics: List[str],
+        line_count: int,
+        json_postings: Optional[Dict[str, Dict[str, List[int]]]] = None,
+        loaded: bool = True,
+    ) -> None:
+        # Postings are in place before _loaded flips, so a search racing the load finds them
+        self._indexes = indexes
+        self._json_postings = json_postings if json_postings is not None else {}
+        self._high_value_lines = None
+        self._substring_indexes = {}
+        self._lowered = {}
+        self._topic_trie = None
+        self._edit_cache = OrderedDict()
+        self._combined_cache = OrderedDict()
+        # Interned so topic names shared with the index keys are stored once
+        self._available_topics = [sys.intern(topic) for topic in available_topics]
+        self._available_topics_preview = tuple(
+            self._available_topics[:TOPICS_PREVIEW_SIZE]
+        )
+        self._available_topics_set = frozenset(self._available_topics)
+        self._line_count = line_count
+        self._loaded = loaded
     
     @property
     def is_loaded(self) -> bool:
@@ -92,8 +458,22 @@ class MetadataIndexLoader:
         if not self._loaded:
             self.load_index()
         return self._available_topics
+
+    @property
+    def available_topics_preview(self) -> Tuple[str, ...]:
+        """Get the first TOPICS_PREVIEW_SIZE topics as a shared, immutable tuple."""
+        if not self._loaded:
+            self.load_index()
+        return self._available_topics_preview
+
+    @property
+    def available_topics_set(self) -> FrozenSet[str]:
+        """Get all available topics as a frozenset for O(1) membership checks."""
+        if not self._loaded:
+            self.load_index()
+        return self._available_topics_set
     
-    def search_by_topic_exact(self, topic: str) -> List[int]:
+    def search_by_topic_exact(self, topic: str) -> np.ndarray:
         """
         Exact match search for a topic.
         
@@ -101,12 +481,14 @@ class MetadataIndexLoader:
             topic: Topic to search (case-sensitive exact match)
             
         Returns:
-            List of matching line numbers
+            Sorted, read-only uint32 array of matching line numbers
         """
         if not self._loaded:
             self.load_index()
         
-        return self._topic_index.get(topic, [])
+        if topic not in self._available_topics_set:
+            return _NO_LINES
+        return self._index("topic").get(topic, _NO_LINES)
     
     def search_by_topics(self, topics: List[str]) -> List[int]:
         """
@@ -121,11 +503,80 @@ class MetadataIndexLoader:
         if not self._loaded:
             self.load_index()
         
-        result_set: Set[int] = set()
-        for topic in topics:
-            result_set.update(self._topic_index.get(topic, []))
+        key = ("or", tuple(sorted(set(topics))))
+        return self._combined(key, lambda: _union_postings(self._topic_postings(topics))).tolist()
+    
+    def search_by_topics_intersection(self, topics: List[str]) -> List[int]:
+        """
+        Search for messages tagged with every given topic (AND).
+        
+        Args:
+            topics: List of topics that must all match
+            
+        Returns:
+            Deduplicated list of matching line numbers, sorted
+        """
+        if not self._loaded:
+            self.load_index()
+        
+        return self.search_and(topics).tolist()
+    
+    def search_and(
+        self,
+        topics: List[str],
+        sentiment: Optional[str] = None,
+        density: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Search for messages matching every given topic and, if set, the sentiment and density.
+        
+        Args:
+            topics: Topics that must all match
+            sentiment: Sentiment label the messages must carry
+            density: Information density the messages must carry
+            
+        Returns:
+            Sorted uint32 array of matching line numbers; may share index memory, so treat as read-only
+        """
+        if not self._loaded:
+            self.load_index()
+        
+        def intersect() -> np.ndarray:
+            postings = self._topic_postings(topics)
+            if sentiment is not None:
+                postings.append(self.search_by_sentiment(sentiment))
+            if density is not None:
+                postings.append(self.search_by_info_density(density))
+            return _intersect_postings(postings)
+        
+        return self._combined(("and", tuple(sorted(set(topics))), sentiment, density), intersect)
+    
+    def _combined(self, key: Tuple[Any, ...], combine: Callable[[], np.ndarray]) -> np.ndarray:
+        """Result of a multi-postings query from the LRU cache, combining it on a miss."""
+        cached = self._combined_cache.get(key)
+        if cached is not None:
+            self._combined_cache.move_to_end(key)
+            return cached
+        
+        lines = combine()
+        lines.setflags(write=False)
+        self._combined_cache[key] = lines
+        if len(self._combined_cache) > COMBINED_SEARCH_CACHE_SIZE:
+            self._combined_cache.popitem(last=False)
+        return lines
+    
+    def _topic_postings(self, topics: List[str]) -> List[np.ndarray]:
+        """
+        Postings of each topic, empty for unknown ones.
         
-        return sorted(result_set)
+        Misses are answered from the in-memory topic set, so a query naming
+        no indexed topic never decodes the topic index.
+        """
+        known = self._available_topics_set
+        if not any(topic in known for topic in topics):
+            return [_NO_LINES] * len(topics)
+        topic_index = self._index("topic")
+        return [topic_index.get(topic, _NO_LINES) for topic in topics]
     
     def search_by_topic_fuzzy(self, query: str) -> List[int]:
         """
@@ -140,14 +591,44 @@ class MetadataIndexLoader:
         if not self._loaded:
             self.load_index()
         
-        query_lower = query.lower()
-        result_set: Set[int] = set()
+        topic_index = self._index("topic")
+        matcher = self._substring_index("topic", lambda: list(topic_index))
+        return _union_postings([
+            topic_index[matcher.names[pos]] for pos in matcher.positions(query.lower())
+        ]).tolist()
+    
+    def search_by_topic_fuzzy_edit(self, query: str, max_dist: int = 1) -> List[int]:
+        """
+        Typo-tolerant topic search by edit distance.
+        
+        Args:
+            query: Topic as typed; compared case-insensitively
+            max_dist: Maximum Levenshtein distance, clamped to 0..2
+            
+        Returns:
+            Deduplicated, sorted line numbers of all topics within max_dist
+        """
+        if not self._loaded:
+            self.load_index()
+        
+        key = (query.lower(), max(0, min(int(max_dist), MAX_TOPIC_EDIT_DISTANCE)))
+        cached = self._edit_cache.get(key)
+        if cached is not None:
+            self._edit_cache.move_to_end(key)
+            return list(cached)
         
-        for topic, line_nums in self._topic_index.items():
-            if query_lower in topic.lower():
-                result_set.update(line_nums)
+        topic_index = self._index("topic")
+        if self._topic_trie is None:
+            topics = list(topic_index)
+            self._topic_trie = _TopicTrie(topics, self._lowercase(topics))
+        lines = _union_postings([
+            topic_index[topic] for topic in self._topic_trie.within(*key)
+        ]).tolist()
         
-        return sorted(result_set)
+        self._edit_cache[key] = lines
+        if len(self._edit_cache) > EDIT_SEARCH_CACHE_SIZE:
+            self._edit_cache.popitem(last=False)
+        return list(lines)
     
     def find_matching_topics(self, query: str, limit: int = 10) -> List[str]:
         """
@@ -163,44 +644,73 @@ class MetadataIndexLoader:
         if not self._loaded:
             self.load_index()
         
-        query_lower = query.lower()
-        matches = []
-        
-        for topic in self._available_topics:
-            if query_lower in topic.lower():
-                matches.append(topic)
-                if len(matches) >= limit:
-                    break
-        
-        return matches
+        matcher = self._substring_index("available", lambda: self._available_topics)
+        # At least one match is returned whenever any topic matches, even for limit < 1
+        positions = matcher.positions(query.lower())[:max(limit, 1)]
+        return [matcher.names[pos] for pos in positions]
+
+    def _substring_index(self, name: str, names: Callable[[], List[str]]) -> _SubstringIndex:
+        """Substring matcher over a topic name list, built on first use after each load."""
+        matcher = self._substring_indexes.get(name)
+        if matcher is None:
+            names = names()
+            order = None
+            if (
+                self._index_mm is not None
+                and "topic_suffixes.positions" in self._index_sections
+                and names == self._available_topics
+            ):
+                order = (
+                    self._section("topic_suffixes.positions"),
+                    self._section("topic_suffixes.starts"),
+                )
+            matcher = _SubstringIndex(names, self._lowercase(names), order)
+            self._substring_indexes[name] = matcher
+        return matcher
+
+    def _lowercase(self, names: List[str]) -> List[str]:
+        """Lowercase forms of names, computed once per load and shared by all matchers."""
+        lowered = self._lowered
+        return [
+            lowered[name] if name in lowered else lowered.setdefault(name, name.lower())
+            for name in names
+        ]
     
-    def search_by_sentiment(self, sentiment: str) -> List[int]:
+    def search_by_sentiment(self, sentiment: str) -> np.ndarray:
         """Search by sentiment label."""
         if not self._loaded:
             self.load_index()
-        return self._sentiment_index.get(sentiment, [])
+        return self._index("sentiment").get(sentiment, _NO_LINES)
     
-    def search_by_fact_key(self, key: str) -> List[int]:
+    def search_by_fact_key(self, key: str) -> np.ndarray:
         """Search by fact key (e.g., "工资", "收入")."""
         if not self._loaded:
             self.load_index()
-        return self._fact_keys_index.get(key, [])
+        return self._index("fact_keys").get(key, _NO_LINES)
     
-    def search_by_info_density(self, density: str) -> List[int]:
+    def search_by_info_density(self, density: str) -> np.ndarray:
         """Search by information density."""
         if not self._loaded:
             self.load_index()
-        return self._info_density_index.get(density, [])
+        return self._index("info_density").get(density, _NO_LINES)
     
-    def get_high_value_messages(self) -> List[int]:
-        """Get messages with high information density."""
+    @property
+    def high_value_lines(self) -> np.ndarray:
+        """Sorted, read-only int64 array of high/medium density lines (built once per load)."""
         if not self._loaded:
             self.load_index()
-        
-        result_set: Set[int] = set()
-        result_set.update(self._info_density_index.get("high", []))
-        result_set.update(self._info_density_index.get("medium", []))
-        return sorted(result_set)
+        if self._high_value_lines is None:
+            lines = np.union1d(
+                self._index("info_density").get("high", _NO_LINES).astype(np.int64),
+                self._index("info_density").get("medium", _NO_LINES).astype(np.int64),
+            )
+            lines.setflags(write=False)
+            self._high_value_lines = lines
+        return self._high_value_lines
+    
+    def get_high_value_messages(self) -> List[int]:
+        """Get messages with high information density."""
+        return self.high_value_lines.tolist()
     
     def get_messages_by_lines(
         self, 
@@ -230,30 +740,109 @@ class MetadataIndexLoader:
         
         target_lines = sorted(expanded)
         target_set = set(target_lines)
+        match_set = set(line_numbers)
         
         results = []
+        
+        def _add(line_num: int, line: str) -> None:
+            line = line.strip()
+            if line:
+                try:
+                    record = json_loads(line)
+                    record["line_number"] = line_num
+                    record["is_match"] = line_num in match_set
+                    results.append(record)
+                except json.JSONDecodeError:
+                    pass
+        
         try:
-            with open(self.chatlog_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, start=1):
-                    if line_num in target_set:
-                        line = line.strip()
-                        if line:
-                            try:
-                                record = json.loads(line)
-                                record["line_number"] = line_num
-                                record["is_match"] = line_num in line_numbers
-                                results.append(record)
-                            except json.JSONDecodeError:
-                                continue
-                    
-                    # Early exit if we've passed all targets
-                    if line_num > max(target_lines):
+            offsets = self._chatlog_line_offsets()
+            if offsets is None:
+                with open(self.chatlog_path, 'rb') as f:
+                    for line_num, raw_line in _read_target_lines(f, target_lines):
+                        _add(line_num, raw_line.decode('utf-8'))
+            else:
+                # Slice each indexed line straight out of the mapped chatlog; lines
+                # appended since the index was built are split off from its end offset
+                chatlog = self._chatlog_map()
+                indexed_lines = len(offsets) - 1
+                for line_num in target_lines:
+                    if line_num > indexed_lines:
                         break
+                    _add(line_num, chatlog[int(offsets[line_num - 1]):int(offsets[line_num])].decode('utf-8'))
+                line_num = indexed_lines
+                position = int(offsets[-1])
+                while line_num < target_lines[-1] and position < len(chatlog):
+                    line_end = chatlog.find(b"\n", position)
+                    line_end = len(chatlog) if line_end < 0 else line_end + 1
+                    line_num += 1
+                    if line_num in target_set:
+                        _add(line_num, chatlog[position:line_end].decode('utf-8'))
+                    position = line_end
         except Exception as e:
             print(f"[INDEX] Error loading messages: {e}")
         
         return results
 
+    def _chatlog_map(self) -> Union[mmap.mmap, bytes]:
+        """Read-only mapping of the whole chatlog, remapped when its size changes."""
+        size = os.path.getsize(self.chatlog_path)
+        chatlog_mm = self._chatlog_mm
+        if chatlog_mm is None or len(chatlog_mm) != size:
+            if size == 0:
+                chatlog_mm = None
+            else:
+                with open(self.chatlog_path, 'rb') as f:
+                    chatlog_mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if hasattr(mmap, "MADV_RANDOM"):
+                    # Lookups jump between scattered lines; skip kernel read-ahead
+                    chatlog_mm.madvise(mmap.MADV_RANDOM)
+            replaced, self._chatlog_mm = self._chatlog_mm, chatlog_mm
+            _close_mapping(replaced)
+        return chatlog_mm if chatlog_mm is not None else b""
+
+    def close(self) -> None:
+        """Release the index and chatlog mappings; the next search reloads the index."""
+        with self._load_lock:
+            mappings = (self._chatlog_mm, self._index_mm)
+            self._chatlog_mm = None
+            self._index_mm = None
+            self._index_header = {}
+            self._index_sections = {}
+            # Drops the tables and substring matchers viewing the mappings before they close
+            self._set_index({}, [], 0, loaded=False)
+        for mapped in mappings:
+            _close_mapping(mapped)
+
+    def _chatlog_line_offsets(self) -> Optional[np.ndarray]:
+        """
+        Byte offsets of chatlog lines from the binary index, or None if unusable.
+
+        Offsets are trusted while the chatlog is unchanged since indexing, or
+        has only grown (chatlogs are appended to); anything else means a scan.
+        """
+        if not self._loaded:
+            self.load_index()
+        if self._index_mm is None or "line_offsets" not in self._index_sections:
+            return None
+        try:
+            stat = os.stat(self.chatlog_path)
+        except OSError:
+            return None
+        indexed_size = self._index_header.get("chatlog_size", -1)
+        if stat.st_size < indexed_size:
+            return None
+        if stat.st_size == indexed_size and stat.st_mtime_ns != self._index_header.get("chatlog_mtime_ns"):
+            return None
+        offsets = self._section("line_offsets")
+        if stat.st_size > indexed_size > 0:
+            # An unterminated last line may have been extended by the append; re-read it
+            with open(self.chatlog_path, 'rb') as f:
+                f.seek(indexed_size - 1)
+                if f.read(1) != b"\n":
+                    offsets = offsets[:-1]
+        return offsets
+
 
 # Global instance
 _index_loader: Optional[MetadataIndexLoader] = None
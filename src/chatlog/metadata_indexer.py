@@ -6,13 +6,221 @@ Creates metadata_index.json with:
 - sentiment_index: sentiment -> [line_numbers]
 - fact_keys_index: fact_key -> [line_numbers]
 - available_topics: list of all unique topics
+
+plus a binary twin (metadata_index.bin) that the loader memory-maps:
+
+    magic (8 bytes) | header length (uint64 LE) | header JSON | sections
+
+The compact header JSON carries line_count, available_topics, the size and
+mtime of the chatlog as indexed and, per section, its (byte offset, dtype,
+length). A uint64 line_offsets section holds the byte offset of every
+chatlog line plus the end offset, so readers can seek straight to a line. Sections are 8-byte aligned; each
+index has three: its sorted keys as a compact UTF-8 JSON list, a postings
+pool and a uint32 bounds array, so key i owns postings
+bounds[i]:bounds[i + 1]. The pool stores each posting list as LEB128
+varints of the gaps between its line numbers (the first gap counts from 0),
+usually one or two bytes per posting instead of four. Readers decode an
+index's keys and pool only when that index is first searched. Two uint32
+topic_suffixes sections (positions, starts) hold every suffix of the
+lowercased available_topics in sorted order, for the loader's substring
+matcher.
+
+update_index() reuses the binary index to parse only the lines appended
+since it was written.
 """
 
 import os
 import json
-from typing import Dict, List, Set, Any
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple, Any
 from collections import defaultdict
 
+import numpy as np
+
+# Optional faster JSON decoder; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Both raise a json.JSONDecodeError subclass on malformed input
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON, encoded by orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+BINARY_INDEX_MAGIC = b"CHLGIDX3"
+POSTINGS_DTYPE = "<u4"
+
+# Binary section name -> MetadataIndexer attribute holding that inverted index
+INDEX_KINDS = {
+    "topic": "topic_index",
+    "sentiment": "sentiment_index",
+    "fact_keys": "fact_keys_index",
+    "info_density": "info_density_index",
+}
+
+
+# Below this size process start-up costs more than parsing in one process
+PARALLEL_BUILD_MIN_BYTES = 32 * 1024 * 1024
+
+
+def binary_index_path(index_path: str) -> str:
+    """Path of the memory-mappable twin of a JSON index."""
+    root, _ = os.path.splitext(index_path)
+    return root + ".bin"
+
+
+def _align8(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def suffix_order(lowered: List[str]) -> Tuple[List[int], List[int]]:
+    """
+    Every suffix of the given names as (name positions, start offsets), sorted by suffix.
+
+    Ties between equal suffixes fall back to the name position.
+    """
+    entries = sorted(
+        (lower_name[start:], pos, start)
+        for pos, lower_name in enumerate(lowered)
+        for start in range(len(lower_name))
+    )
+    return [pos for _, pos, _ in entries], [start for _, _, start in entries]
+
+
+def encode_postings(pool: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """Varint-encode the gaps of each sorted posting list pool[bounds[i]:bounds[i + 1]]."""
+    gaps = pool.astype(np.uint32)
+    gaps[1:] -= pool[:-1]
+    starts = bounds[:-1][np.diff(bounds) > 0]
+    gaps[starts] = pool[starts]
+
+    # Bytes per gap: 7 payload bits each, the high bit flags a following byte
+    widths = np.ones(gaps.size, dtype=np.int64)
+    for shift in (7, 14, 21, 28):
+        widths += gaps >= (1 << shift)
+    first_byte = np.cumsum(widths) - widths
+    encoded = np.empty(int(widths.sum()), dtype=np.uint8)
+    for byte in range(5):
+        has_byte = widths > byte
+        chunk = (gaps[has_byte] >> (7 * byte)) & 0x7F
+        chunk |= (widths[has_byte] > byte + 1).astype(np.uint32) << 7
+        encoded[first_byte[has_byte] + byte] = chunk
+    return encoded
+
+
+def decode_postings(encoded: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """Inverse of encode_postings: the concatenated uint32 posting lists."""
+    if not encoded.size:
+        return np.empty(0, dtype=POSTINGS_DTYPE)
+    last_bytes = np.flatnonzero(encoded < 0x80)
+    first_bytes = np.empty_like(last_bytes)
+    first_bytes[0] = 0
+    first_bytes[1:] = last_bytes[:-1] + 1
+    # Byte k of a varint carries bits 7k..7k+6 of its gap
+    byte_pos = np.arange(encoded.size) - np.repeat(first_bytes, last_bytes - first_bytes + 1)
+    payload = (encoded & 0x7F).astype(np.uint64) << (7 * byte_pos).astype(np.uint64)
+    gaps = np.add.reduceat(payload, first_bytes)
+
+    # Running sums restart at each list: subtract the total before its first posting
+    totals = np.cumsum(gaps)
+    bounds = bounds.astype(np.int64)
+    counts = np.diff(bounds)
+    before = np.zeros(counts.size, dtype=np.uint64)
+    nonempty = counts > 0
+    before[nonempty] = totals[bounds[:-1][nonempty]] - gaps[bounds[:-1][nonempty]]
+    return (totals - np.repeat(before, counts)).astype(POSTINGS_DTYPE)
+
+
+def _index_chunk(chatlog_path: str, start: int, end: Optional[int]) -> Dict[str, Any]:
+    """
+    Index the chatlog lines that start in [start, end), to EOF when end is None.
+    
+    Line numbers in the returned postings and line_count are relative to the
+    chunk (its first line is 1); line_offsets are absolute byte offsets.
+    Runs in a worker process, so everything returned is plain picklable data.
+    """
+    topic_index: Dict[str, List[int]] = defaultdict(list)
+    sentiment_index: Dict[str, List[int]] = defaultdict(list)
+    fact_keys_index: Dict[str, List[int]] = defaultdict(list)
+    info_density_index: Dict[str, List[int]] = defaultdict(list)
+    available_topics: Set[str] = set()
+    line_count = 0
+    
+    # Read bytes so each line's start offset is known exactly
+    line_offsets = array("Q")
+    position = start
+    if end is None:
+        end = sys.maxsize
+    
+    # Hot loop: bind lookups once and test exact JSON types with `type() is`
+    loads = json_loads
+    add_offset = line_offsets.append
+    add_topic = available_topics.add
+    with open(chatlog_path, 'rb') as f:
+        f.seek(start)
+        for line_num, raw_line in enumerate(f, start=1):
+            if position >= end:
+                break
+            add_offset(position)
+            position += len(raw_line)
+            line = raw_line.decode('utf-8').strip()
+            if not line:
+                continue
+            
+            try:
+                record = loads(line)
+            except json.JSONDecodeError:
+                continue
+            get = record.get("metadata", {}).get
+            
+            # Index topics
+            topics = get("topics", [])
+            if type(topics) is list:
+                for topic in topics:
+                    if type(topic) is str and topic:
+                        topic = topic.strip()
+                        topic_index[topic].append(line_num)
+                        add_topic(topic)
+            
+            # Index sentiment
+            sentiment = get("sentiment", "")
+            if sentiment:
+                sentiment_index[sentiment].append(line_num)
+            
+            # Index fact keys
+            facts = get("facts", {})
+            if type(facts) is dict:
+                for key in facts:
+                    fact_keys_index[key].append(line_num)
+            
+            # Index information density
+            info_density = get("information_density", "")
+            if info_density:
+                info_density_index[info_density].append(line_num)
+            
+            line_count = line_num
+    
+    return {
+        "topic_index": dict(topic_index),
+        "sentiment_index": dict(sentiment_index),
+        "fact_keys_index": dict(fact_keys_index),
+        "info_density_index": dict(info_density_index),
+        "available_topics": available_topics,
+        "line_count": line_count,
+        "line_offsets": line_offsets,
+        "end": position,
+    }
+
 
 class MetadataIndexer:
     """Builds inverted index from chatlog JSONL metadata."""
@@ -27,19 +235,32 @@ class MetadataIndexer:
         
         self.chatlog_path = chatlog_path
         self.index_path = chatlog_path.replace(".jsonl", "_index.json")
+        self.binary_index_path = binary_index_path(self.index_path)
         
-        # Index structures
+        self._reset()
+    
+    def _reset(self) -> None:
+        """Clear all index structures."""
         self.topic_index: Dict[str, List[int]] = defaultdict(list)
         self.sentiment_index: Dict[str, List[int]] = defaultdict(list)
         self.fact_keys_index: Dict[str, List[int]] = defaultdict(list)
         self.info_density_index: Dict[str, List[int]] = defaultdict(list)
         self.available_topics: Set[str] = set()
         self.line_count = 0
+        
+        # line_offsets[n - 1] is the byte offset of line n; the last entry is the bytes indexed
+        self.line_offsets = array("Q")
+        self.chatlog_size = 0
+        self.chatlog_mtime_ns = 0
     
-    def build_index(self) -> bool:
+    def build_index(self, workers: Optional[int] = None) -> bool:
         """
         Build inverted index from chatlog JSONL.
         
+        Args:
+            workers: Processes to split the chatlog across. Defaults to the CPU
+                count for chatlogs of PARALLEL_BUILD_MIN_BYTES or more, else 1.
+        
         Returns:
             True if successful, False otherwise.
         """
@@ -50,45 +271,29 @@ class MetadataIndexer:
         print(f"[INDEXER] Building index from: {self.chatlog_path}")
         
         try:
-            with open(self.chatlog_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, start=1):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    try:
-                        record = json.loads(line)
-                        metadata = record.get("metadata", {})
-                        
-                        # Index topics
-                        topics = metadata.get("topics", [])
-                        if isinstance(topics, list):
-                            for topic in topics:
-                                if topic and isinstance(topic, str):
-                                    topic = topic.strip()
-                                    self.topic_index[topic].append(line_num)
-                                    self.available_topics.add(topic)
-                        
-                        # Index sentiment
-                        sentiment = metadata.get("sentiment", "")
-                        if sentiment:
-                            self.sentiment_index[sentiment].append(line_num)
-                        
-                        # Index fact keys
-                        facts = metadata.get("facts", {})
-                        if isinstance(facts, dict):
-                            for key in facts.keys():
-                                self.fact_keys_index[key].append(line_num)
-                        
-                        # Index information density
-                        info_density = metadata.get("information_density", "")
-                        if info_density:
-                            self.info_density_index[info_density].append(line_num)
-                        
-                        self.line_count = line_num
-                        
-                    except json.JSONDecodeError:
-                        continue
+            with open(self.chatlog_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                if workers is None:
+                    workers = (os.cpu_count() or 1) if stat.st_size >= PARALLEL_BUILD_MIN_BYTES else 1
+                chunk_starts = [0]
+                for i in range(1, max(1, workers)):
+                    # Snap each split point forward to the start of a line
+                    f.seek(max(stat.st_size * i // workers - 1, 0))
+                    f.readline()
+                    if f.tell() > chunk_starts[-1] and f.tell() < stat.st_size:
+                        chunk_starts.append(f.tell())
+            chunk_ends = chunk_starts[1:] + [None]
+            
+            if len(chunk_starts) == 1:
+                chunks = [_index_chunk(self.chatlog_path, 0, None)]
+            else:
+                with ProcessPoolExecutor(max_workers=len(chunk_starts)) as pool:
+                    chunks = list(pool.map(
+                        _index_chunk, [self.chatlog_path] * len(chunk_starts), chunk_starts, chunk_ends
+                    ))
+            
+            self._merge_chunks(chunks, array("Q"))
+            self.chatlog_mtime_ns = stat.st_mtime_ns
             
             print(f"[INDEXER] Indexed {self.line_count} messages")
             print(f"[INDEXER] Found {len(self.available_topics)} unique topics")
@@ -98,6 +303,113 @@ class MetadataIndexer:
             print(f"[INDEXER] Error building index: {e}")
             return False
     
+    def _merge_chunks(self, chunks: List[Dict[str, Any]], line_offsets: array) -> None:
+        """Append chunk results after the lines already in line_offsets (less its end entry)."""
+        # Chunks cover consecutive line ranges, so shifting each one's line
+        # numbers and appending keeps every posting list sorted
+        for chunk in chunks:
+            base = len(line_offsets)
+            for attr in INDEX_KINDS.values():
+                index = getattr(self, attr)
+                for key, lines in chunk[attr].items():
+                    index[key].extend([line_num + base for line_num in lines] if base else lines)
+            self.available_topics.update(chunk["available_topics"])
+            if chunk["line_count"]:
+                self.line_count = chunk["line_count"] + base
+            line_offsets.extend(chunk["line_offsets"])
+        
+        line_offsets.append(chunks[-1]["end"])
+        self.line_offsets = line_offsets
+        self.chatlog_size = chunks[-1]["end"]
+    
+    def update_index(self) -> bool:
+        """
+        Index only the lines appended since the saved binary index was built.
+        
+        Falls back to a full build_index when there is no usable binary index
+        or the chatlog was changed other than by appending whole lines.
+        
+        Returns:
+            True if successful, False otherwise.
+        """
+        if not os.path.exists(self.chatlog_path):
+            print(f"[INDEXER] Error: Chatlog not found: {self.chatlog_path}")
+            return False
+        
+        if not self._load_binary_index():
+            return self.build_index()
+        
+        try:
+            with open(self.chatlog_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                appended = stat.st_size > self.chatlog_size
+                if self.chatlog_size:
+                    # A last line without its newline may itself have grown
+                    f.seek(self.chatlog_size - 1)
+                    appended = appended and f.read(1) == b"\n"
+            
+            if stat.st_size == self.chatlog_size and stat.st_mtime_ns == self.chatlog_mtime_ns:
+                print(f"[INDEXER] Index is up to date: {self.line_count} messages")
+                return True
+            if not appended:
+                print("[INDEXER] Chatlog was rewritten, rebuilding index")
+                self._reset()
+                return self.build_index()
+            
+            print(f"[INDEXER] Indexing lines appended after byte {self.chatlog_size}")
+            self._merge_chunks(
+                [_index_chunk(self.chatlog_path, self.chatlog_size, None)],
+                self.line_offsets[:-1],
+            )
+            self.chatlog_mtime_ns = stat.st_mtime_ns
+            
+            print(f"[INDEXER] Indexed {self.line_count} messages")
+            print(f"[INDEXER] Found {len(self.available_topics)} unique topics")
+            return True
+            
+        except Exception as e:
+            print(f"[INDEXER] Error updating index: {e}")
+            return False
+    
+    def _load_binary_index(self) -> bool:
+        """Restore the indexer state from the saved binary index, if it is readable."""
+        if not os.path.exists(self.binary_index_path):
+            return False
+        try:
+            with open(self.binary_index_path, 'rb') as f:
+                data = f.read()
+            if data[:len(BINARY_INDEX_MAGIC)] != BINARY_INDEX_MAGIC:
+                return False
+            header_start = len(BINARY_INDEX_MAGIC) + 8
+            (header_len,) = struct.unpack_from("<Q", data, len(BINARY_INDEX_MAGIC))
+            header = json_loads(data[header_start:header_start + header_len])
+            base = header_start + header_len
+            
+            def section(name: str) -> np.ndarray:
+                offset, dtype, count = header["sections"][name]
+                return np.frombuffer(data, dtype=dtype, count=count, offset=base + offset)
+            
+            self._reset()
+            for kind, attr in INDEX_KINDS.items():
+                keys = json_loads(section(f"{kind}.keys").tobytes())
+                bounds = section(f"{kind}.bounds")
+                pool = decode_postings(section(f"{kind}.pool"), bounds)
+                bounds = bounds.tolist()
+                index = getattr(self, attr)
+                for i, key in enumerate(keys):
+                    index[key] = pool[bounds[i]:bounds[i + 1]].tolist()
+            self.available_topics = set(header["available_topics"])
+            self.line_count = header["line_count"]
+            self.line_offsets = array("Q", section("line_offsets").tolist())
+            self.chatlog_size = header["chatlog_size"]
+            self.chatlog_mtime_ns = header["chatlog_mtime_ns"]
+            return True
+        
+        except Exception as e:
+            print(f"[INDEXER] Cannot reuse binary index, rebuilding: {e}")
+            self._reset()
+            return False
+    
     def save_index(self) -> bool:
         """
         Save index to JSON file.
@@ -115,16 +427,85 @@ class MetadataIndexer:
         }
         
         try:
-            with open(self.index_path, 'w', encoding='utf-8') as f:
-                json.dump(index_data, f, ensure_ascii=False, indent=2)
+            with open(self.index_path, 'wb') as f:
+                f.write(json_dumps(index_data))
             
             print(f"[INDEXER] Index saved to: {self.index_path}")
             print(f"[INDEXER] Index size: {os.path.getsize(self.index_path) / 1024:.1f} KB")
-            return True
             
         except Exception as e:
             print(f"[INDEXER] Error saving index: {e}")
             return False
+
+        return self.save_index_mmap()
+
+    def save_index_mmap(self) -> bool:
+        """
+        Save the memory-mappable binary index next to the JSON one.
+
+        Returns:
+            True if successful, False otherwise.
+        """
+        sections: Dict[str, np.ndarray] = {}
+        for kind, attr in INDEX_KINDS.items():
+            index = getattr(self, attr)
+            keys = sorted(index)
+            counts = np.fromiter((len(index[key]) for key in keys), dtype=np.int64, count=len(keys))
+            bounds = np.zeros(len(keys) + 1, dtype=POSTINGS_DTYPE)
+            bounds[1:] = np.cumsum(counts)
+            pool = np.fromiter(
+                (line_num for key in keys for line_num in index[key]),
+                dtype=POSTINGS_DTYPE,
+                count=int(bounds[-1]),
+            )
+            keys_blob = json_dumps(keys)
+            sections[f"{kind}.keys"] = np.frombuffer(keys_blob, dtype=np.uint8)
+            sections[f"{kind}.bounds"] = bounds
+            sections[f"{kind}.pool"] = encode_postings(pool, bounds)
+
+        # Substring matcher order over available_topics, so readers skip the sort
+        positions, starts = suffix_order([topic.lower() for topic in sorted(self.available_topics)])
+        sections["topic_suffixes.positions"] = np.asarray(positions, dtype=POSTINGS_DTYPE)
+        sections["topic_suffixes.starts"] = np.asarray(starts, dtype=POSTINGS_DTYPE)
+
+        sections["line_offsets"] = np.frombuffer(self.line_offsets, dtype=np.uint64).astype("<u8")
+
+        # Section offsets are relative to the first byte after the (padded) header
+        layout: Dict[str, List[Any]] = {}
+        offset = 0
+        for name, array in sections.items():
+            layout[name] = [offset, array.dtype.str, int(array.size)]
+            offset = _align8(offset + array.nbytes)
+
+        header = json_dumps({
+            "line_count": self.line_count,
+            "available_topics": sorted(self.available_topics),
+            "chatlog_size": self.chatlog_size,
+            "chatlog_mtime_ns": self.chatlog_mtime_ns,
+            "sections": layout,
+        })
+        header += b" " * (_align8(len(header)) - len(header))
+
+        tmp_path = self.binary_index_path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(BINARY_INDEX_MAGIC)
+                f.write(struct.pack("<Q", len(header)))
+                f.write(header)
+                written = 0
+                for name, array in sections.items():
+                    start = layout[name][0]
+                    f.write(b"\0" * (start - written))
+                    f.write(array.tobytes())
+                    written = start + array.nbytes
+            os.replace(tmp_path, self.binary_index_path)
+
+            print(f"[INDEXER] Binary index saved to: {self.binary_index_path}")
+            return True
+
+        except Exception as e:
+            print(f"[INDEXER] Error saving binary index: {e}")
+            return False
     
     def get_stats(self) -> Dict[str, Any]:
         """Get indexing statistics."""
@@ -141,10 +522,10 @@ class MetadataIndexer:
         }
 
 
-def build_and_save_index(chatlog_path: str = None) -> bool:
-    """Convenience function to build and save index."""
+def build_and_save_index(chatlog_path: str = None, incremental: bool = True) -> bool:
+    """Convenience function to build (or, by default, extend) and save index."""
     indexer = MetadataIndexer(chatlog_path)
-    if indexer.build_index():
+    if indexer.update_index() if incremental else indexer.build_index():
         if indexer.save_index():
             stats = indexer.get_stats()
             print(f"\n[INDEXER] Stats:")
@@ -8,11 +8,66 @@ Features:
 - Person-focused filtering
 """
 
-from typing import List, Set, Dict, Any, Optional, Tuple
+import io
+from operator import attrgetter
+from typing import Iterable, Iterator, List, Set, Dict, Any, Optional
 from dataclasses import dataclass, field
+
+import numpy as np
+
 from .loader import ChatlogLoader, ChatMessage, get_chatlog_loader
 
 
+_message_content = attrgetter("content")
+
+
+def _total_chars(messages: List[ChatMessage]) -> int:
+    """Summed content length of the messages."""
+    return sum(map(len, map(_message_content, messages)))
+
+
+def _window_lines(centers: Iterable[int], before: int, after: int) -> np.ndarray:
+    """
+    Ascending distinct lines covered by the [center - before, center + after]
+    windows (clamped at line 1): the windows are merged into runs, then the runs
+    are expanded, both without a per-line Python loop.
+    """
+    keys = np.fromiter(centers, dtype=np.int64)
+    if not keys.size:
+        return keys
+    keys.sort()
+    starts = np.maximum(1, keys - before)
+    ends = keys + after
+    # Windows are sorted by start and end alike, so a run breaks wherever a
+    # window starts past the previous window's end plus one
+    heads = np.flatnonzero(np.r_[True, starts[1:] > ends[:-1] + 1])
+    run_starts = starts[heads]
+    run_ends = ends[np.r_[heads[1:] - 1, keys.size - 1]]
+    lengths = run_ends - run_starts + 1
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(lengths.sum()) + np.repeat(run_starts - offsets, lengths)
+
+
+def _priority_lines(matches: Iterable[int], limit: int, radius: int = 2) -> List[int]:
+    """
+    Ascending first `limit` distinct lines of the [match - radius, match + radius]
+    windows (clamped at line 1) of the matches, taken in ascending match order.
+
+    Each window only adds lines past the previous window's end, so the lines come
+    out sorted without a set or a sort.
+    """
+    lines: List[int] = []
+    last = 0
+    for line_num in sorted(matches):
+        end = line_num + radius
+        for ln in range(max(last + 1, line_num - radius), end + 1):
+            lines.append(ln)
+            if len(lines) >= limit:
+                return lines
+        last = max(last, end)
+    return lines
+
+
 @dataclass
 class SearchResult:
     """Result of a chatlog search."""
@@ -34,14 +89,8 @@ class SearchResult:
         if not self.messages:
             return "未找到相关聊天记录。"
         
-        lines = []
-        for msg in self.messages:
-            if include_line_numbers:
-                lines.append(msg.format_with_line())
-            else:
-                lines.append(msg.format_simple())
-        
-        return "\n".join(lines)
+        fmt = ChatMessage.format_with_line if include_line_numbers else ChatMessage.format_simple
+        return "\n".join(map(fmt, self.messages))
     
     def get_summary(self) -> str:
         """Get a summary of the search result."""
@@ -104,17 +153,11 @@ class ChatlogSearcher:
         # Collect all matching line numbers
         matched_lines: Dict[int, Set[str]] = {}  # line_number -> set of matched keywords
         
-        for keyword in keywords:
-            if not keyword.strip():
-                continue
-            
-            # Use comprehensive search (content + topics + facts metadata)
-            matching = self.loader.comprehensive_search(
-                [keyword], 
-                include_content=True,
-                include_topics=True,
-                include_facts=True
-            )
+        # Comprehensive search (content + topics + facts metadata), one pass for all keywords
+        keyword_matches = self.loader.search_keywords(
+            list(dict.fromkeys(keyword for keyword in keywords if keyword.strip()))
+        )
+        for keyword, matching in keyword_matches.items():
             for line_num in matching:
                 if line_num not in matched_lines:
                     matched_lines[line_num] = set()
@@ -122,56 +165,29 @@ class ChatlogSearcher:
         
         # If target person specified, also search for their messages
         if target_person:
-            person_messages = self.loader.get_messages_by_sender(target_person)
-            for msg in person_messages:
-                if msg.line_number not in matched_lines:
-                    matched_lines[msg.line_number] = set()
-                matched_lines[msg.line_number].add(f"发送者:{target_person}")
+            for line_num in self.loader.get_line_numbers_by_sender(target_person):
+                if line_num not in matched_lines:
+                    matched_lines[line_num] = set()
+                matched_lines[line_num].add(f"发送者:{target_person}")
         
         if not matched_lines:
             return SearchResult()
         
-        # Expand context windows for each match
-        all_line_numbers: Set[int] = set()
-        for line_num in matched_lines.keys():
-            # Get context window
-            start = max(1, line_num - self.context_before)
-            end = line_num + self.context_after
-            
-            for ln in range(start, end + 1):
-                all_line_numbers.add(ln)
-        
-        # Sort and deduplicate
-        sorted_lines = sorted(all_line_numbers)
+        # All lines in the context windows of the matches, ascending
+        window_lines = _window_lines(matched_lines, self.context_before, self.context_after)
         
         # Limit results
-        if len(sorted_lines) > max_results:
-            # Prioritize lines that matched keywords directly
-            direct_matches = sorted(matched_lines.keys())
-            
-            # Start with direct matches and their immediate context
-            priority_lines: Set[int] = set()
-            for line_num in direct_matches:
-                start = max(1, line_num - 2)  # Smaller context for priority
-                end = line_num + 2
-                for ln in range(start, end + 1):
-                    priority_lines.add(ln)
-                    if len(priority_lines) >= max_results:
-                        break
-                if len(priority_lines) >= max_results:
-                    break
-            
-            sorted_lines = sorted(priority_lines)
+        if window_lines.size > max_results:
+            # Prioritize lines that matched keywords directly, with a smaller context
+            sorted_lines = _priority_lines(matched_lines, max_results)
+        else:
+            sorted_lines = window_lines.tolist()
         
         # Collect messages
-        messages: List[ChatMessage] = []
-        for line_num in sorted_lines:
-            msg = self.loader.get_message(line_num)
-            if msg:
-                messages.append(msg)
+        messages = self.loader.get_messages(sorted_lines)
         
         # Calculate total chars
-        total_chars = sum(len(msg.content) for msg in messages)
+        total_chars = _total_chars(messages)
         
         # Collect matched keywords
         all_keywords: Set[str] = set()
@@ -245,45 +261,22 @@ class ChatlogSearcher:
             }
 
         if target_person:
-            person_messages = self.loader.get_messages_by_sender(target_person)
-            for msg in person_messages:
-                matched_lines.setdefault(msg.line_number, set()).add(
-                    f"发送者:{target_person}"
-                )
+            for line_num in self.loader.get_line_numbers_by_sender(target_person):
+                matched_lines.setdefault(line_num, set()).add(f"发送者:{target_person}")
 
         if not matched_lines:
             return SearchResult()
 
-        all_line_numbers: Set[int] = set()
-        for line_num in matched_lines.keys():
-            start = max(1, line_num - self.context_before)
-            end = line_num + self.context_after
-            for ln in range(start, end + 1):
-                all_line_numbers.add(ln)
-
-        sorted_lines = sorted(all_line_numbers)
-
-        if len(sorted_lines) > max_results:
-            direct_matches = sorted(matched_lines.keys())
-            priority_lines: Set[int] = set()
-            for line_num in direct_matches:
-                start = max(1, line_num - 2)
-                end = line_num + 2
-                for ln in range(start, end + 1):
-                    priority_lines.add(ln)
-                    if len(priority_lines) >= max_results:
-                        break
-                if len(priority_lines) >= max_results:
-                    break
-            sorted_lines = sorted(priority_lines)
-
-        messages: List[ChatMessage] = []
-        for line_num in sorted_lines:
-            msg = self.loader.get_message(line_num)
-            if msg:
-                messages.append(msg)
-
-        total_chars = sum(len(msg.content) for msg in messages)
+        window_lines = _window_lines(matched_lines, self.context_before, self.context_after)
+
+        if window_lines.size > max_results:
+            sorted_lines = _priority_lines(matched_lines, max_results)
+        else:
+            sorted_lines = window_lines.tolist()
+
+        messages = self.loader.get_messages(sorted_lines)
+
+        total_chars = _total_chars(messages)
 
         all_keywords: Set[str] = set()
         for kw_set in matched_lines.values():
@@ -317,8 +310,7 @@ class ChatlogSearcher:
             SearchResult
         """
         # Get all messages from this person
-        person_messages = self.loader.get_messages_by_sender(person)
-        person_lines = {msg.line_number for msg in person_messages}
+        person_lines = set(self.loader.get_line_numbers_by_sender(person))
         
         # Also search keywords
         keyword_result = self.search(keywords, target_person=None, max_results=max_results * 2)
@@ -341,13 +333,9 @@ class ChatlogSearcher:
         sorted_lines = sorted(combined_lines)[:max_results]
         
         # Collect messages
-        messages: List[ChatMessage] = []
-        for line_num in sorted_lines:
-            msg = self.loader.get_message(line_num)
-            if msg:
-                messages.append(msg)
+        messages = self.loader.get_messages(sorted_lines)
         
-        total_chars = sum(len(msg.content) for msg in messages)
+        total_chars = _total_chars(messages)
         
         return SearchResult(
             messages=messages,
@@ -374,27 +362,20 @@ class ChatlogSearcher:
         Returns:
             List of message segments
         """
-        if not result.messages:
-            return []
-        
-        segments: List[List[ChatMessage]] = []
-        current_segment: List[ChatMessage] = [result.messages[0]]
-        
-        for i in range(1, len(result.messages)):
-            prev_msg = result.messages[i - 1]
-            curr_msg = result.messages[i]
-            
-            if curr_msg.line_number - prev_msg.line_number > gap_threshold:
-                # Start new segment
-                segments.append(current_segment)
-                current_segment = [curr_msg]
-            else:
-                current_segment.append(curr_msg)
-        
-        if current_segment:
-            segments.append(current_segment)
-        
-        return segments
+        return list(self._iter_segments(result, gap_threshold))
+    
+    @staticmethod
+    def _iter_segments(result: SearchResult, gap_threshold: int) -> Iterator[List[ChatMessage]]:
+        """Yield the conversation segments of get_conversation_segments one at a time."""
+        messages = result.messages
+        if not messages:
+            return
+        start = 0
+        for i in range(1, len(messages)):
+            if messages[i].line_number - messages[i - 1].line_number > gap_threshold:
+                yield messages[start:i]
+                start = i
+        yield messages[start:]
     
     def format_segmented_output(
         self,
@@ -414,21 +395,17 @@ class ChatlogSearcher:
         if result.matched_line_keywords:
             return self.format_context_windows(result)
 
-        segments = self.get_conversation_segments(result, gap_threshold)
-
-        if not segments:
+        if not result.messages:
             return "未找到相关聊天记录。"
 
-        output_parts = []
-        for i, segment in enumerate(segments):
+        buf = io.StringIO()
+        for i, segment in enumerate(self._iter_segments(result, gap_threshold)):
             if i > 0:
-                output_parts.append("\n--- 对话片段分隔 ---\n")
-
-            for msg in segment:
-                output_parts.append(msg.format_simple())
-
-        return "\n".join(output_parts)
+                buf.write("\n\n--- 对话片段分隔 ---\n\n")
+            buf.write("\n".join(map(ChatMessage.format_simple, segment)))
 
+        return buf.getvalue()
+    
     def format_context_windows(
         self,
         result: SearchResult,
@@ -439,26 +416,23 @@ class ChatlogSearcher:
             return "未找到相关聊天记录。"
 
         matched_lines = sorted(result.matched_line_keywords.keys())
-        output_parts: List[str] = []
+        before, after = self.context_before, self.context_after
+        get_messages = self.loader.get_messages
+        buf = io.StringIO()
+        write = buf.write
 
         for idx, line_num in enumerate(matched_lines[:max_windows], 1):
-            start = max(1, line_num - self.context_before)
-            end = line_num + self.context_after
-
-            output_parts.append(
-                f"--- 命中窗口 {idx} (行 {line_num}, ±{self.context_before}/{self.context_after}) ---"
-            )
-
-            for ln in range(start, end + 1):
-                msg = self.loader.get_message(ln)
-                if not msg:
-                    continue
-                sender = msg.sender or "未知"
-                content = msg.message or msg.content
-                tag = "命中" if ln == line_num else "上下文"
-                confidence = "高" if ln == line_num else "中"
-                output_parts.append(
-                    f"[{msg.timestamp}] {sender}: {content} (行{msg.line_number} {tag} 置信度:{confidence})"
+            if idx > 1:
+                write("\n")
+            write(f"--- 命中窗口 {idx} (行 {line_num}, ±{before}/{after}) ---")
+
+            window = range(max(1, line_num - before), line_num + after + 1)
+            # Lines past the end are dropped, so messages align with the window's start
+            for ln, msg in zip(window, get_messages(window)):
+                label = "命中 置信度:高" if ln == line_num else "上下文 置信度:中"
+                write(
+                    f"\n[{msg.timestamp}] {msg.sender or '未知'}: {msg.message or msg.content}"
+                    f" (行{msg.line_number} {label})"
                 )
 
-        return "\n".join(output_parts)
+        return buf.getvalue()
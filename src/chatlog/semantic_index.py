@@ -3,14 +3,54 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib import request
 
 import numpy as np
 
 
+def _unit_rows(mat: np.ndarray) -> np.ndarray:
+    """Rows scaled to unit L2 norm as float32, so cosine similarity is one matrix product."""
+    mat = np.asarray(mat, dtype=np.float32)
+    if mat.ndim != 2:
+        return mat
+    return mat / (np.linalg.norm(mat, axis=1, keepdims=True) + 1e-12)
+
+
+# Rows converted per step when scanning quantized codes; small enough that the
+# float32 copy of a block stays in cache for the matrix product that reads it
+_SCAN_BLOCK_ROWS = 1024
+
+
+def _top_columns(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Column indices of the k largest scores in each row, unordered.
+
+    Partitions around the (n - k)-th element instead of negating the scores,
+    which would copy the whole score matrix first.
+    """
+    n = scores.shape[1]
+    return np.argpartition(scores, n - k, axis=1)[:, n - k:]
+
+
+def _quantize_rows(mat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row symmetric int8 codes and float32 scales of the unit-norm rows of mat."""
+    codes = np.empty(mat.shape, dtype=np.int8)
+    scales = np.empty(mat.shape[0], dtype=np.float32)
+    for start in range(0, mat.shape[0], _SCAN_BLOCK_ROWS):
+        block = _unit_rows(mat[start:start + _SCAN_BLOCK_ROWS])
+        block_scales = np.abs(block).max(axis=1) / 127.0
+        block_scales[block_scales == 0] = 1.0
+        codes[start:start + len(block)] = np.round(block / block_scales[:, None])
+        scales[start:start + len(block)] = block_scales
+    return codes, scales
+
+
 @dataclass
 class SemanticIndexConfig:
     model: str = "embedding-3"
@@ -20,6 +60,18 @@ class SemanticIndexConfig:
     embeddings_path: str = "cleaned_chatlog_embeddings.npy"
     index_path: str = "cleaned_chatlog_embeddings_index.json"
     batch_size: int = 32
+    # Embedding batches in flight at once while building, started at least
+    # request_interval seconds apart
+    concurrency: int = 4
+    request_interval: float = 0.2
+    cache_size: int = 512
+    cache_threshold: float = 0.95
+    # "int8": rank on per-row int8 codes, then rescore the best candidates in float32
+    quantize: str = "int8"
+    rerank_candidates: int = 200
+    # Maximal Marginal Relevance trade-off between relevance and novelty over a
+    # pool of 4 * top_k hits; 1.0 keeps the plain similarity ranking
+    mmr_lambda: float = 1.0
 
 
 class SemanticIndex:
@@ -27,9 +79,20 @@ class SemanticIndex:
 
     def __init__(self, config: Optional[SemanticIndexConfig] = None) -> None:
         self.config = config or SemanticIndexConfig()
+        # Unit-norm rows, memory-mapped from a normalized copy cached next to the
+        # embeddings. With int8 quantization this is instead the memory-mapped
+        # stored matrix, read only for reranking.
         self._embeddings: Optional[np.ndarray] = None
-        self._line_numbers: Optional[List[int]] = None
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        # Chatlog line number of each embedding row
+        self._line_array: Optional[np.ndarray] = None
         self._loaded = False
+        # query key -> (unit query embedding, ranked lines, ranked scores)
+        self._cache: "OrderedDict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Serializes load() so the warm-up thread and a first query map the files once
+        self._load_lock = threading.Lock()
 
     def _api_key(self) -> str:
         return os.getenv(self.config.api_key_env, "").strip()
@@ -45,17 +108,83 @@ class SemanticIndex:
     def load(self) -> bool:
         if self._loaded:
             return True
-        if not self.is_available():
-            return False
+        with self._load_lock:
+            if self._loaded:
+                return True
+            if not self.is_available():
+                return False
+            try:
+                self._set_embeddings(np.load(self.config.embeddings_path, mmap_mode="r"))
+                (self._line_array,) = self._derived_arrays(
+                    (".lines.npy",), (None,), self._read_line_numbers,
+                    source=self.config.index_path,
+                )
+                self._loaded = True
+                return True
+            except Exception:
+                return False
+
+    def _set_embeddings(self, mat: np.ndarray) -> None:
+        if mat.ndim != 2:
+            self._embeddings = _unit_rows(mat)
+            self._codes = self._scales = None
+        elif self.config.quantize == "int8":
+            self._embeddings = mat
+            self._codes, self._scales = self._derived_arrays(
+                (".int8.npy", ".scale.npy"),
+                (mat.shape, mat.shape[:1]),
+                lambda: _quantize_rows(mat),
+            )
+        else:
+            (self._embeddings,) = self._derived_arrays(
+                (".unit.npy",), (mat.shape,), lambda: (_unit_rows(mat),)
+            )
+            self._codes = self._scales = None
+
+    def _read_line_numbers(self) -> Tuple[np.ndarray]:
+        with open(self.config.index_path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        return (np.asarray(payload.get("line_numbers", []), dtype=np.int32),)
+
+    def _derived_arrays(
+        self,
+        suffixes: Tuple[str, ...],
+        shapes: Tuple[Optional[Tuple[int, ...]], ...],
+        compute: Callable[[], Tuple[np.ndarray, ...]],
+        source: Optional[str] = None,
+    ) -> Tuple[np.ndarray, ...]:
+        """
+        Arrays computed from `source` (default: the embeddings), cached next to
+        the embeddings as <name><suffix>.
+
+        Cached files are memory-mapped while they are not older than the source
+        and have the expected shapes (None: any shape); otherwise they are
+        recomputed and rewritten.
+        """
+        source = source or self.config.embeddings_path
+        root, _ = os.path.splitext(self.config.embeddings_path)
+        paths = [root + suffix for suffix in suffixes]
         try:
-            self._embeddings = np.load(self.config.embeddings_path)
-            with open(self.config.index_path, "r", encoding="utf-8") as f:
-                payload = json.load(f)
-            self._line_numbers = payload.get("line_numbers", [])
-            self._loaded = True
-            return True
-        except Exception:
-            return False
+            source_mtime = os.path.getmtime(source)
+            if min(os.path.getmtime(path) for path in paths) >= source_mtime:
+                arrays = tuple(np.load(path, mmap_mode="r") for path in paths)
+                if all(
+                    shape is None or array.shape == shape
+                    for array, shape in zip(arrays, shapes)
+                ):
+                    return arrays
+        except (OSError, ValueError):
+            pass
+
+        arrays = compute()
+        try:
+            for path, array in zip(paths, arrays):
+                tmp_path = path + ".tmp.npy"
+                np.save(tmp_path, array)
+                os.replace(tmp_path, path)
+        except OSError:
+            pass  # Read-only location: recompute on the next load
+        return arrays
 
     def _embed_texts(self, texts: List[str]) -> List[List[float]]:
         api_key = self._api_key()
@@ -111,11 +240,25 @@ class SemanticIndex:
                 line_numbers.append(line_num)
                 texts.append(content)
 
-        embeddings: List[List[float]] = []
-        for i in range(0, len(texts), self.config.batch_size):
-            batch = texts[i:i + self.config.batch_size]
-            embeddings.extend(self._embed_texts(batch))
-            time.sleep(0.2)  # gentle pacing to avoid rate spikes
+        batches = [
+            texts[i:i + self.config.batch_size]
+            for i in range(0, len(texts), self.config.batch_size)
+        ]
+        # Requests are I/O-bound; overlap them but keep their start times paced
+        # to avoid rate spikes
+        pace_lock = threading.Lock()
+        next_start = [time.monotonic()]
+
+        def embed_paced(batch: List[str]) -> List[List[float]]:
+            with pace_lock:
+                now = time.monotonic()
+                start = max(now, next_start[0])
+                next_start[0] = start + self.config.request_interval
+            time.sleep(start - now)
+            return self._embed_texts(batch)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.config.concurrency)) as pool:
+            embeddings = [vec for result in pool.map(embed_paced, batches) for vec in result]
 
         matrix = np.asarray(embeddings, dtype=np.float32)
         np.save(self.config.embeddings_path, matrix)
@@ -125,31 +268,181 @@ class SemanticIndex:
                 "model": self.config.model,
                 "created_at": int(time.time()),
             }, f, ensure_ascii=False, indent=2)
-        self._embeddings = matrix
-        self._line_numbers = line_numbers
+        self._set_embeddings(np.load(self.config.embeddings_path, mmap_mode="r"))
+        line_array = np.asarray(line_numbers, dtype=np.int32)
+        (self._line_array,) = self._derived_arrays(
+            (".lines.npy",), (line_array.shape,), lambda: (line_array,),
+            source=self.config.index_path,
+        )
         self._loaded = True
+        with self._cache_lock:
+            self._cache.clear()
         return len(line_numbers), self.config.embeddings_path, self.config.index_path
 
     def search(self, query: str, top_k: int = 50) -> List[Tuple[int, float]]:
-        if not self.load():
-            return []
-        if self._embeddings is None or self._line_numbers is None:
+        lines, scores = self.search_batch([query], top_k=top_k)
+        if not lines.size:
             return []
-        query_vec = self._embed_texts([query])[0]
-        q = np.asarray(query_vec, dtype=np.float32)
-        if q.size == 0:
-            return []
-        q = q / (np.linalg.norm(q) + 1e-12)
+        return list(zip(lines[0].tolist(), scores[0].tolist()))
+
+    def search_batch(
+        self, queries: List[str], top_k: int = 50
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search several queries with one embedding request and one matrix product.
+
+        Returns (lines, scores), both shaped (len(queries), k) with each row
+        ordered by descending score like search(). Queries already in the
+        semantic cache, by text or by a near-identical embedding, skip the sweep.
+        """
+        empty = (np.empty((0, 0), dtype=np.int64), np.empty((0, 0), dtype=np.float32))
+        if not queries or not self.load():
+            return empty
+        if self._embeddings is None or self._line_array is None:
+            return empty
         mat = self._embeddings
-        denom = np.linalg.norm(mat, axis=1) + 1e-12
-        sims = (mat @ q) / denom
-        if sims.size == 0:
-            return []
-        top_k = min(top_k, sims.size)
-        idx = np.argpartition(-sims, top_k - 1)[:top_k]
-        ranked = sorted(((int(i), float(sims[i])) for i in idx), key=lambda x: x[1], reverse=True)
-        return [(self._line_numbers[i], score) for i, score in ranked]
+        top_k = min(top_k, mat.shape[0]) if mat.ndim == 2 else 0
+        if top_k <= 0:
+            return empty
+
+        rows: List[Optional[Tuple[np.ndarray, np.ndarray]]] = [
+            self._cache_get(query, top_k) for query in queries
+        ]
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if missing:
+            q = np.asarray(self._embed_texts([queries[i] for i in missing]), dtype=np.float32)
+            if q.ndim != 2 or q.shape[1] == 0:
+                return empty
+            q = q / (np.linalg.norm(q, axis=1, keepdims=True) + 1e-12)
+            found = self._cache_match(q, top_k)
+            pending = [j for j, row in enumerate(found) if row is None]
+            if pending:
+                lines, scores = self._rank(q[pending], top_k)
+                for pos, j in enumerate(pending):
+                    found[j] = (lines[pos], scores[pos])
+                    self._cache_put(queries[missing[j]], q[j], lines[pos], scores[pos])
+            for j, i in enumerate(missing):
+                rows[i] = found[j]
+        return np.stack([row[0] for row in rows]), np.stack([row[1] for row in rows])
+
+    def _rank(self, q: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        pool = top_k
+        if self.config.mmr_lambda < 1.0:
+            pool = min(self._embeddings.shape[0], 4 * top_k)
+        if self._codes is None:
+            sims = q @ self._embeddings.T
+            idx = _top_columns(sims, pool)
+            top_sims = np.take_along_axis(sims, idx, axis=1)
+        else:
+            idx, top_sims = self._rank_quantized(q, pool)
+        order = np.argsort(-top_sims, axis=1, kind="stable")
+        idx = np.take_along_axis(idx, order, axis=1)
+        top_sims = np.take_along_axis(top_sims, order, axis=1)
+        if self.config.mmr_lambda < 1.0:
+            idx, top_sims = self._diversify(idx, top_sims, top_k)
+        return self._line_array[idx], top_sims
+
+    def _diversify(
+        self, idx: np.ndarray, sims: np.ndarray, top_k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Greedy MMR selection of top_k rows from each query's ranked pool.
+
+        Returns (row indices, query similarities) in selection order.
+        """
+        weight = self.config.mmr_lambda
+        chosen_idx = np.empty((idx.shape[0], top_k), dtype=idx.dtype)
+        chosen_sims = np.empty((idx.shape[0], top_k), dtype=sims.dtype)
+        for row in range(idx.shape[0]):
+            vectors = _unit_rows(self._embeddings[idx[row]])
+            relevance = weight * sims[row]
+            redundancy = np.full(idx.shape[1], -np.inf, dtype=np.float32)
+            available = np.ones(idx.shape[1], dtype=bool)
+            for pos in range(top_k):
+                penalty = (1.0 - weight) * redundancy if pos else 0.0
+                marginal = np.where(available, relevance - penalty, -np.inf)
+                best = int(marginal.argmax())
+                available[best] = False
+                chosen_idx[row, pos] = idx[row, best]
+                chosen_sims[row, pos] = sims[row, best]
+                np.maximum(redundancy, vectors @ vectors[best], out=redundancy)
+        return chosen_idx, chosen_sims
+
+    def _rank_quantized(self, q: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate sweep over the int8 codes, then exact float32 scores for the
+        best max(rerank_candidates, 4 * top_k) rows per query.
+
+        Returns (row indices, exact scores) of each query's top_k, unordered.
+        """
+        codes, scales = self._codes, self._scales
+        n = codes.shape[0]
+        approx = np.empty((q.shape[0], n), dtype=np.float32)
+        buffer = np.empty((min(n, _SCAN_BLOCK_ROWS), codes.shape[1]), dtype=np.float32)
+        for start in range(0, n, _SCAN_BLOCK_ROWS):
+            stop = min(n, start + _SCAN_BLOCK_ROWS)
+            block = buffer[:stop - start]
+            block[...] = codes[start:stop]
+            approx[:, start:stop] = (q @ block.T) * scales[start:stop]
+
+        n_candidates = min(n, max(4 * top_k, self.config.rerank_candidates))
+        candidates = _top_columns(approx, n_candidates)
+        rows = np.unique(candidates)
+        exact = q @ _unit_rows(self._embeddings[rows]).T
+        sims = np.take_along_axis(exact, np.searchsorted(rows, candidates), axis=1)
+
+        best = _top_columns(sims, top_k)
+        return np.take_along_axis(candidates, best, axis=1), np.take_along_axis(sims, best, axis=1)
+
+    @staticmethod
+    def _cache_key(query: str) -> str:
+        return query.strip().lower()
+
+    def _cache_get(self, query: str, top_k: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if self.config.cache_size <= 0:
+            return None
+        key = self._cache_key(query)
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[1].size < top_k:
+                return None
+            self._cache.move_to_end(key)
+            return entry[1][:top_k], entry[2][:top_k]
+
+    def _cache_match(
+        self, q: np.ndarray, top_k: int
+    ) -> List[Optional[Tuple[np.ndarray, np.ndarray]]]:
+        """Serve queries whose embedding is within the cosine threshold of a cached one."""
+        found: List[Optional[Tuple[np.ndarray, np.ndarray]]] = [None] * len(q)
+        if self.config.cache_size <= 0 or self.config.cache_threshold > 1.0:
+            return found
+        with self._cache_lock:
+            entries = [
+                (key, entry) for key, entry in self._cache.items()
+                if entry[1].size >= top_k and entry[0].shape == q.shape[1:]
+            ]
+            if not entries:
+                return found
+            sims = q @ np.stack([entry[0] for _, entry in entries]).T
+            best = sims.argmax(axis=1)
+            for j, b in enumerate(best.tolist()):
+                if sims[j, b] >= self.config.cache_threshold:
+                    key, entry = entries[b]
+                    self._cache.move_to_end(key)
+                    found[j] = (entry[1][:top_k], entry[2][:top_k])
+        return found
 
+    def _cache_put(
+        self, query: str, vec: np.ndarray, lines: np.ndarray, scores: np.ndarray
+    ) -> None:
+        if self.config.cache_size <= 0:
+            return
+        key = self._cache_key(query)
+        with self._cache_lock:
+            self._cache[key] = (vec.copy(), lines.copy(), scores.copy())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.config.cache_size:
+                self._cache.popitem(last=False)
 
 _semantic_index: Optional[SemanticIndex] = None
 
@@ -168,6 +461,12 @@ def get_semantic_index() -> SemanticIndex:
                 "cleaned_chatlog_embeddings_index.json"
             ),
             batch_size=int(os.getenv("CHATLOG_EMBEDDINGS_BATCH", "32")),
+            concurrency=int(os.getenv("CHATLOG_EMBED_CONCURRENCY", "4")),
+            cache_size=int(os.getenv("CHATLOG_SEMCACHE_SIZE", "512")),
+            cache_threshold=float(os.getenv("CHATLOG_SEMCACHE_THRESHOLD", "0.95")),
+            quantize=os.getenv("CHATLOG_EMBEDDINGS_QUANTIZE", "int8").strip().lower(),
+            rerank_candidates=int(os.getenv("CHATLOG_SEMANTIC_RERANK", "200")),
+            mmr_lambda=float(os.getenv("CHATLOG_SEMANTIC_MMR_LAMBDA", "1.0")),
         )
         _semantic_index = SemanticIndex(config)
     return _semantic_index
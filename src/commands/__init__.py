@@ -4,7 +4,8 @@ Command Handler Module
 Provides a centralized command dispatcher that routes commands to appropriate handlers.
 """
 
-from typing import List, Type
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Type
 from rich.console import Console
 
 from .base import AppState, CommandHandler, CommandResult
@@ -13,6 +14,27 @@ from .model import MODEL_HANDLERS
 from .utility import UTILITY_HANDLERS
 
 
+# All handler classes, in registration order
+HANDLER_CLASSES: List[Type[CommandHandler]] = [
+    *SESSION_HANDLERS,
+    *MODEL_HANDLERS,
+    *UTILITY_HANDLERS,
+]
+
+
+def _build_command_table() -> Mapping[str, Type[CommandHandler]]:
+    """Lowercased command name -> handler class; the first registered class wins."""
+    table: Dict[str, Type[CommandHandler]] = {}
+    for handler_class in HANDLER_CLASSES:
+        for command in handler_class.commands:
+            table.setdefault(command.lower(), handler_class)
+    return MappingProxyType(table)
+
+
+# Built once at import; dispatchers only map it onto their handler instances
+COMMAND_TABLE = _build_command_table()
+
+
 class CommandDispatcher:
     """
     Centralized command dispatcher.
@@ -23,20 +45,24 @@ class CommandDispatcher:
     def __init__(self, state: AppState):
         self.state = state
         self.handlers: List[CommandHandler] = []
+        # Lowercased command name -> handler; the first registered handler wins
+        self._by_command: Dict[str, CommandHandler] = {}
         
         # Register all handlers
         self._register_handlers()
     
     def _register_handlers(self) -> None:
         """Register all command handlers."""
-        all_handler_classes: List[Type[CommandHandler]] = [
-            *SESSION_HANDLERS,
-            *MODEL_HANDLERS,
-            *UTILITY_HANDLERS,
-        ]
+        instances: Dict[Type[CommandHandler], CommandHandler] = {}
+        for handler_class in HANDLER_CLASSES:
+            handler = handler_class(self.state)
+            self.handlers.append(handler)
+            instances[handler_class] = handler
         
-        for handler_class in all_handler_classes:
-            self.handlers.append(handler_class(self.state))
+        self._by_command = {
+            command: instances[handler_class]
+            for command, handler_class in COMMAND_TABLE.items()
+        }
     
     async def handle(self, text: str) -> CommandResult:
         """
@@ -54,9 +80,9 @@ class CommandDispatcher:
         arg = parts[1] if len(parts) > 1 else ""
         
         # Find a handler for this command
-        for handler in self.handlers:
-            if handler.can_handle(command):
-                return await handler.handle(command, arg)
+        handler = self._by_command.get(command)
+        if handler is not None:
+            return await handler.handle(command, arg)
         
         # No handler found
         return CommandResult.not_handled()
@@ -80,5 +106,6 @@ __all__ = [
     "CommandHandler",
     "CommandResult",
     "CommandDispatcher",
+    "COMMAND_TABLE",
     "create_dispatcher",
 ]
@@ -11,10 +11,43 @@ from pathlib import Path
 from typing import Optional, Any, Callable, Awaitable
 from rich.console import Console
 
+from src.ui.styles import COLORS
+
 # Forward imports to avoid circular dependencies
 # Actual types will be set at runtime
 
 
+def _style_tags(name: str) -> tuple[str, str]:
+    style = COLORS[name]
+    return f"[{style}]", f"[/{style}]"
+
+
+_SUCCESS = _style_tags("success")
+_WARNING = _style_tags("warning")
+_ERROR = _style_tags("error")
+_MUTED = _style_tags("muted")
+
+
+def success_text(message: str) -> str:
+    """Wrap message in the success style markup."""
+    return _SUCCESS[0] + message + _SUCCESS[1]
+
+
+def warning_text(message: str) -> str:
+    """Wrap message in the warning style markup."""
+    return _WARNING[0] + message + _WARNING[1]
+
+
+def error_text(message: str) -> str:
+    """Wrap message in the error style markup."""
+    return _ERROR[0] + message + _ERROR[1]
+
+
+def muted_text(message: str) -> str:
+    """Wrap message in the muted style markup."""
+    return _MUTED[0] + message + _MUTED[1]
+
+
 @dataclass
 class AppState:
     """
@@ -44,6 +77,9 @@ class AppState:
     # Session state
     resume_session_id: Optional[str] = None
     
+    # Digest of the config last written by /save
+    last_config_digest: Optional[bytes] = None
+    
     # Managers (set during initialization)
     session_manager: Any = None
     session_transcript: Any = None  # SessionTranscript for conversation history
@@ -113,6 +149,7 @@ class CommandHandler:
     def __init__(self, state: AppState):
         self.state = state
         self.console = state.console
+        self.commands = [command.lower() for command in self.commands]
     
     def can_handle(self, command: str) -> bool:
         """Check if this handler can handle the given command."""
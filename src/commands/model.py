@@ -9,14 +9,45 @@ Handles model and configuration commands:
 - /thinking - Toggle thinking display/budget
 """
 
-from rich.table import Table
-from rich.box import ROUNDED
+from types import MappingProxyType
+from typing import Optional
 
-from .base import CommandHandler, CommandResult, AppState
-from src.ui.styles import COLORS
+from .base import (
+    CommandHandler, CommandResult, AppState,
+    error_text, muted_text, success_text, warning_text,
+)
 from src.ui.components import SelectionMenu
 
 
+# Static menu entries, built once at import
+_MODELS_DATA = tuple(MappingProxyType(model) for model in (
+    {"id": "claude-opus-4-5", "name": "Opus 4.5", "desc": "Most capable for complex work", "extra": "$15/Mtok", "badge": "New"},
+    {"id": "claude-sonnet-4-5", "name": "Sonnet 4.5", "desc": "Balanced intelligence & speed (Recommended)", "extra": "$3/Mtok", "badge": "New"},
+    {"id": "claude-haiku-4-5", "name": "Haiku 4.5", "desc": "Fastest for quick answers", "extra": "$1/Mtok"},
+    {"id": "claude-opus-4-1", "name": "Opus 4.1", "desc": "Previous generation flagship", "extra": "$15/Mtok"},
+    {"id": "claude-sonnet-4", "name": "Sonnet 4", "desc": "Previous generation balanced", "extra": "$3/Mtok"},
+))
+
+_MAX_TURN_OPTIONS = (2, 4, 6, 8, 12, 16, 24, 32)
+_MAX_TURN_ITEMS = tuple(
+    MappingProxyType({"id": str(val), "name": str(val), "desc": "turns"})
+    for val in _MAX_TURN_OPTIONS
+)
+
+_TRUTHY = frozenset({"on", "1", "true", "yes"})
+_FALSY = frozenset({"off", "0", "false", "no"})
+
+
+def _parse_bool(arg: str) -> Optional[bool]:
+    """Parse an on/off style argument; None if it is neither."""
+    value = arg.strip().lower()
+    if value in _TRUTHY:
+        return True
+    if value in _FALSY:
+        return False
+    return None
+
+
 class ModelHandler(CommandHandler):
     """Handles /model command - show or set model."""
     
@@ -28,20 +59,12 @@ class ModelHandler(CommandHandler):
             from src.context.manager import ContextManager
             self.state.context_manager = ContextManager(model=self.state.model)
             self.state.needs_reconnect()
-            self.console.print(f"[{COLORS['success']}]✓ Model set to: {self.state.model}[/{COLORS['success']}]")
+            self.console.print(success_text(f"✓ Model set to: {self.state.model}"))
         else:
             # Use the reusable SelectionMenu component
-            models_data = [
-                {"id": "claude-opus-4-5", "name": "Opus 4.5", "desc": "Most capable for complex work", "extra": "$15/Mtok", "badge": "New"},
-                {"id": "claude-sonnet-4-5", "name": "Sonnet 4.5", "desc": "Balanced intelligence & speed (Recommended)", "extra": "$3/Mtok", "badge": "New"},
-                {"id": "claude-haiku-4-5", "name": "Haiku 4.5", "desc": "Fastest for quick answers", "extra": "$1/Mtok"},
-                {"id": "claude-opus-4-1", "name": "Opus 4.1", "desc": "Previous generation flagship", "extra": "$15/Mtok"},
-                {"id": "claude-sonnet-4", "name": "Sonnet 4", "desc": "Previous generation balanced", "extra": "$3/Mtok"},
-            ]
-            
             menu = SelectionMenu(
                 title="Select Model",
-                items=models_data,
+                items=_MODELS_DATA,
                 description="Switch between Claude models. Applies to this session.",
                 current_value=self.state.model,
             )
@@ -53,9 +76,9 @@ class ModelHandler(CommandHandler):
                 from src.context.manager import ContextManager
                 self.state.context_manager = ContextManager(model=self.state.model)
                 self.state.needs_reconnect()
-                self.console.print(f"[{COLORS['success']}]✓ Model set to: {self.state.model}[/{COLORS['success']}]")
+                self.console.print(success_text(f"✓ Model set to: {self.state.model}"))
             else:
-                self.console.print(f"[{COLORS['muted']}]Cancelled[/{COLORS['muted']}]")
+                self.console.print(muted_text("Cancelled"))
         
         return CommandResult.success()
 
@@ -71,8 +94,8 @@ class ToolsHandler(CommandHandler):
             # Ensure Task is included for subagent support
             if "Task" not in self.state.allowed_tools:
                 self.state.allowed_tools.append("Task")
-                self.console.print(f"[{COLORS['warning']}]Note: 'Task' tool added for subagent support[/{COLORS['warning']}]")
-            self.console.print(f"[{COLORS['success']}]✓ Tools: {', '.join(self.state.allowed_tools)}[/{COLORS['success']}]")
+                self.console.print(warning_text("Note: 'Task' tool added for subagent support"))
+            self.console.print(success_text(f"✓ Tools: {', '.join(self.state.allowed_tools)}"))
             self.state.needs_reconnect()
         else:
             self.console.print(f"[cyan]Tools:[/cyan] {', '.join(self.state.allowed_tools)}")
@@ -89,25 +112,21 @@ class MaxTurnsHandler(CommandHandler):
         if arg:
             try:
                 self.state.max_turns = int(arg)
-                self.console.print(f"[{COLORS['success']}]✓ Max turns: {self.state.max_turns}[/{COLORS['success']}]")
+                self.console.print(success_text(f"✓ Max turns: {self.state.max_turns}"))
                 self.state.needs_reconnect()
             except ValueError:
-                self.console.print(f"[{COLORS['error']}]✗ Invalid number[/{COLORS['error']}]")
+                self.console.print(error_text("✗ Invalid number"))
         else:
-            options = [2, 4, 6, 8, 12, 16, 24, 32]
-            items = [
-                {"id": str(val), "name": str(val), "desc": "turns"} for val in options
-            ]
             menu = SelectionMenu(
                 title="Set Max Turns",
-                items=items,
+                items=_MAX_TURN_ITEMS,
                 description="Select a max turn limit for this session.",
                 current_value=str(self.state.max_turns),
             )
             selected_id = await menu.run()
             if selected_id:
                 self.state.max_turns = int(selected_id)
-                self.console.print(f"[{COLORS['success']}]✓ Max turns: {self.state.max_turns}[/{COLORS['success']}]")
+                self.console.print(success_text(f"✓ Max turns: {self.state.max_turns}"))
                 self.state.needs_reconnect()
             else:
                 self.console.print(f"[cyan]Max turns:[/cyan] {self.state.max_turns}")
@@ -122,17 +141,17 @@ class ContinueHandler(CommandHandler):
     
     async def handle(self, command: str, arg: str) -> CommandResult:
         if arg:
-            value = arg.strip().lower()
-            if value in {"on", "1", "true"}:
+            enabled = _parse_bool(arg)
+            if enabled is True:
                 self.state.continue_conversation = True
-                self.console.print(f"[{COLORS['success']}]✓ Continue conversation: ON[/{COLORS['success']}]")
+                self.console.print(success_text("✓ Continue conversation: ON"))
                 self.state.needs_reconnect()
-            elif value in {"off", "0", "false"}:
+            elif enabled is False:
                 self.state.continue_conversation = False
-                self.console.print(f"[{COLORS['success']}]✓ Continue conversation: OFF[/{COLORS['success']}]")
+                self.console.print(success_text("✓ Continue conversation: OFF"))
                 self.state.needs_reconnect()
             else:
-                self.console.print(f"[{COLORS['warning']}]Usage: /continue on|off[/{COLORS['warning']}]")
+                self.console.print(warning_text("Usage: /continue on|off"))
         else:
             status = "ON" if self.state.continue_conversation else "OFF"
             self.console.print(f"[cyan]Continue conversation:[/cyan] {status}")
@@ -147,29 +166,29 @@ class ThinkingHandler(CommandHandler):
     
     async def handle(self, command: str, arg: str) -> CommandResult:
         if arg:
-            value = arg.strip().lower()
-            if value in {"on", "1", "true"}:
+            enabled = _parse_bool(arg)
+            if enabled is True:
                 self.state.show_thinking = True
                 if self.state.thinking_budget == 0:
                     self.state.thinking_budget = 4096  # default budget
-                self.console.print(f"[{COLORS['success']}]✓ Thinking display: ON (Budget: {self.state.thinking_budget})[/{COLORS['success']}]")
-            elif value in {"off", "0", "false"}:
+                self.console.print(success_text(f"✓ Thinking display: ON (Budget: {self.state.thinking_budget})"))
+            elif enabled is False:
                 self.state.show_thinking = False
                 self.state.thinking_budget = 0
-                self.console.print(f"[{COLORS['success']}]✓ Thinking display: OFF[/{COLORS['success']}]")
+                self.console.print(success_text("✓ Thinking display: OFF"))
             else:
                 try:
-                    budget_val = int(value)
+                    budget_val = int(arg.strip())
                     if budget_val > 0:
                         self.state.show_thinking = True
                         self.state.thinking_budget = budget_val
-                        self.console.print(f"[{COLORS['success']}]✓ Thinking budget set to: {self.state.thinking_budget}[/{COLORS['success']}]")
+                        self.console.print(success_text(f"✓ Thinking budget set to: {self.state.thinking_budget}"))
                     else:
                         self.state.show_thinking = False
                         self.state.thinking_budget = 0
-                        self.console.print(f"[{COLORS['success']}]✓ Thinking display: OFF[/{COLORS['success']}]")
+                        self.console.print(success_text("✓ Thinking display: OFF"))
                 except ValueError:
-                    self.console.print(f"[{COLORS['warning']}]Usage: /thinking on|off|[tokens][/{COLORS['warning']}]")
+                    self.console.print(warning_text("Usage: /thinking on|off|[tokens]"))
         else:
             status = "ON" if self.state.show_thinking else "OFF"
             self.console.print(f"[cyan]Thinking display:[/cyan] {status}")
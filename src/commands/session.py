@@ -9,12 +9,8 @@ Handles session-related commands:
 - /sessions - List recent sessions
 """
 
-from rich.table import Table
-from rich.box import ROUNDED
-
-from .base import CommandHandler, CommandResult, AppState
+from .base import CommandHandler, CommandResult, AppState, muted_text, success_text
 from src.ui.components import SelectionMenu
-from src.ui.styles import COLORS
 
 
 class SessionHandler(CommandHandler):
@@ -44,7 +40,7 @@ class ResetHandler(CommandHandler):
     async def handle(self, command: str, arg: str) -> CommandResult:
         self.state.session_manager.clear_current_session()
         self.state.context_manager.clear()
-        self.console.print(f"[{COLORS['success']}]✓ Session and context cleared[/{COLORS['success']}]")
+        self.console.print(success_text("✓ Session and context cleared"))
         return CommandResult.success()
 
 
@@ -90,25 +86,27 @@ class ResumeHandler(CommandHandler):
                     self.state.session_manager.set_current_session_id(selected_id)
                     self._show_resume_info(selected_id)
                 else:
-                    self.console.print(f"[{COLORS['muted']}]Cancelled[/{COLORS['muted']}]")
+                    self.console.print(muted_text("Cancelled"))
             else:
-                self.console.print(f"[{COLORS['muted']}]No sessions found[/{COLORS['muted']}]")
+                self.console.print(muted_text("No sessions found"))
         
         return CommandResult.success()
     
     def _show_resume_info(self, session_id: str) -> None:
         """Show resume confirmation and transcript preview."""
-        self.console.print(f"[{COLORS['success']}]✓ Resuming session: {session_id}[/{COLORS['success']}]")
+        lines = [success_text(f"✓ Resuming session: {session_id}")]
         
         # Show transcript preview if available
         if self.state.session_transcript and self.state.session_transcript.transcript_exists(session_id):
             messages = self.state.session_transcript.load_messages(session_id)
             if messages:
-                self.console.print(f"[{COLORS['muted']}]  → Loaded {len(messages)} messages from history[/{COLORS['muted']}]")
+                lines.append(muted_text(f"  → Loaded {len(messages)} messages from history"))
                 # Show last message as preview
                 if len(messages) > 0:
                     preview = messages[-1].content[:50] + "..." if len(messages[-1].content) > 50 else messages[-1].content
-                    self.console.print(f"[{COLORS['muted']}]  Last: {messages[-1].role}: {preview}[/{COLORS['muted']}]")
+                    lines.append(muted_text(f"  Last: {messages[-1].role}: {preview}"))
+        
+        self.console.print("\n".join(lines))
 
 
 class ForkHandler(CommandHandler):
@@ -118,7 +116,7 @@ class ForkHandler(CommandHandler):
     
     async def handle(self, command: str, arg: str) -> CommandResult:
         forked_id = self.state.session_manager.fork_session()
-        self.console.print(f"[{COLORS['success']}]✓ Forked to new session: {forked_id}[/{COLORS['success']}]")
+        self.console.print(success_text(f"✓ Forked to new session: {forked_id}"))
         self.state.resume_session_id = forked_id
         return CommandResult.success()
 
@@ -134,7 +132,7 @@ class SessionsHandler(CommandHandler):
             from tui_agent import render_session_table
             self.console.print(render_session_table(sessions, "Recent Sessions"))
         else:
-            self.console.print(f"[{COLORS['muted']}]No sessions found[/{COLORS['muted']}]")
+            self.console.print(muted_text("No sessions found"))
         
         return CommandResult.success()
 
@@ -13,15 +13,15 @@ Handles utility and information commands:
 - /exit, /quit, /q - Exit application
 """
 
+import hashlib
 import json
-import os
+from functools import lru_cache
 from pathlib import Path
 
-from rich.table import Table
-from rich.syntax import Syntax
-from rich.box import ROUNDED
-
-from .base import CommandHandler, CommandResult, AppState
+from .base import (
+    CommandHandler, CommandResult, AppState,
+    error_text, muted_text, success_text, warning_text,
+)
 from src.ui.styles import COLORS
 
 
@@ -31,6 +31,7 @@ class HelpHandler(CommandHandler):
     commands = ["/help"]
     
     async def handle(self, command: str, arg: str) -> CommandResult:
+        from rich.table import Table
         from tui_agent import print_slash_hints, COMMANDS_META
         
         print_slash_hints()
@@ -84,21 +85,24 @@ class SaveHandler(CommandHandler):
     async def handle(self, command: str, arg: str) -> CommandResult:
         from tui_agent import CONFIG_PATH, CONTEXT_PATH
         
-        CONFIG_PATH.write_text(
-            json.dumps({
-                "model": self.state.model,
-                "max_turns": self.state.max_turns,
-                "allowed_tools": self.state.allowed_tools,
-                "continue_conversation": "1" if self.state.continue_conversation else "0",
-                "show_thinking": self.state.show_thinking,
-                "thinking_budget": self.state.thinking_budget,
-            }, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+        payload = json.dumps({
+            "model": self.state.model,
+            "max_turns": self.state.max_turns,
+            "allowed_tools": self.state.allowed_tools,
+            "continue_conversation": "1" if self.state.continue_conversation else "0",
+            "show_thinking": self.state.show_thinking,
+            "thinking_budget": self.state.thinking_budget,
+        }, ensure_ascii=False, indent=2)
+        
+        # Skip the write when the config is unchanged since the last /save
+        digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+        if digest != self.state.last_config_digest or not CONFIG_PATH.exists():
+            CONFIG_PATH.write_text(payload, encoding="utf-8")
+            self.state.last_config_digest = digest
         
         # Also save context state
         self.state.context_manager.save_to_file(str(CONTEXT_PATH))
-        self.console.print(f"[{COLORS['success']}]✓ Saved to {CONFIG_PATH}[/{COLORS['success']}]")
+        self.console.print(success_text(f"✓ Saved to {CONFIG_PATH}"))
         return CommandResult.success()
 
 
@@ -109,6 +113,7 @@ class InfoHandler(CommandHandler):
     
     async def handle(self, command: str, arg: str) -> CommandResult:
         if self.state.client:
+            from rich.syntax import Syntax
             try:
                 info = await self.state.client.get_server_info()
                 self.console.print(Syntax(
@@ -117,9 +122,9 @@ class InfoHandler(CommandHandler):
                     theme="monokai",
                 ))
             except Exception as e:
-                self.console.print(f"[{COLORS['error']}]Failed to get info: {e}[/{COLORS['error']}]")
+                self.console.print(error_text(f"Failed to get info: {e}"))
         else:
-            self.console.print(f"[{COLORS['muted']}]Not connected yet[/{COLORS['muted']}]")
+            self.console.print(muted_text("Not connected yet"))
         
         return CommandResult.success()
 
@@ -142,13 +147,16 @@ class ContextHandler(CommandHandler):
     
     async def handle(self, command: str, arg: str) -> CommandResult:
         stats = self.state.context_manager.get_stats()
-        self.console.print(f"[cyan]Token usage:[/cyan] {stats['current_tokens']}/{stats['max_tokens']} ({stats['usage_ratio']:.1%})")
-        self.console.print(f"[cyan]Messages:[/cyan] {stats['message_count']}")
-        self.console.print(f"[cyan]Has summary:[/cyan] {'Yes' if stats['has_summary'] else 'No'}")
+        lines = [
+            f"[cyan]Token usage:[/cyan] {stats['current_tokens']}/{stats['max_tokens']} ({stats['usage_ratio']:.1%})",
+            f"[cyan]Messages:[/cyan] {stats['message_count']}",
+            f"[cyan]Has summary:[/cyan] {'Yes' if stats['has_summary'] else 'No'}",
+        ]
         
         if stats['usage_ratio'] > 0.8:
-            self.console.print(f"[{COLORS['warning']}]Warning: Context is getting full. Consider /compact[/{COLORS['warning']}]")
+            lines.append(warning_text("Warning: Context is getting full. Consider /compact"))
         
+        self.console.print("\n".join(lines))
         return CommandResult.success()
 
 
@@ -159,14 +167,14 @@ class CompactHandler(CommandHandler):
     
     async def handle(self, command: str, arg: str) -> CommandResult:
         if self.state.client:
-            self.console.print(f"[{COLORS['muted']}]Generating summary...[/{COLORS['muted']}]")
+            self.console.print(muted_text("Generating summary..."))
             self.state.context_manager.clear_keep_summary()
-            self.console.print(f"[{COLORS['success']}]✓ Context compacted with summary[/{COLORS['success']}]")
+            self.console.print(success_text("✓ Context compacted with summary"))
             stats = self.state.context_manager.get_stats()
             self.console.print(f"[cyan]New token usage:[/cyan] {stats['current_tokens']}/{stats['max_tokens']}")
         else:
             self.state.context_manager.clear_keep_summary()
-            self.console.print(f"[{COLORS['success']}]✓ Context compacted (basic summary)[/{COLORS['success']}]")
+            self.console.print(success_text("✓ Context compacted (basic summary)"))
         
         return CommandResult.success()
 
@@ -180,35 +188,43 @@ class ClearHandler(CommandHandler):
         from tui_agent import print_dashboard
         
         self.state.context_manager.clear()
-        os.system("cls" if os.name == "nt" else "clear")
+        self.console.clear()
         print_dashboard(self.state.model)
         return CommandResult.success()
 
 
+@lru_cache(maxsize=1)
+def _build_agents_table():
+    """The /agents table; agent definitions are static, so it is built once."""
+    from rich.box import ROUNDED
+    from rich.table import Table
+    from src.agents.definitions import get_agent_definitions
+    
+    agents = get_agent_definitions()
+    table = Table(title="Available Subagents", box=ROUNDED)
+    table.add_column("Name", style="cyan")
+    table.add_column("Description", style="white")
+    table.add_column("Model", style="green")
+    table.add_column("Tools", style="dim")
+    
+    for name, agent in agents.items():
+        table.add_row(
+            name,
+            agent.description[:50] + "..." if len(agent.description) > 50 else agent.description,
+            agent.model,
+            ", ".join(agent.tools) if agent.tools else "inherit"
+        )
+    
+    return table
+
+
 class AgentsHandler(CommandHandler):
     """Handles /agents command - list available subagents."""
     
     commands = ["/agents"]
     
     async def handle(self, command: str, arg: str) -> CommandResult:
-        from src.agents.definitions import get_agent_definitions
-        
-        agents = get_agent_definitions()
-        table = Table(title="Available Subagents", box=ROUNDED)
-        table.add_column("Name", style="cyan")
-        table.add_column("Description", style="white")
-        table.add_column("Model", style="green")
-        table.add_column("Tools", style="dim")
-        
-        for name, agent in agents.items():
-            table.add_row(
-                name,
-                agent.description[:50] + "..." if len(agent.description) > 50 else agent.description,
-                agent.model,
-                ", ".join(agent.tools) if agent.tools else "inherit"
-            )
-        
-        self.console.print(table)
+        self.console.print(_build_agents_table())
         self.console.print(f"\n[dim]Use these with the Task tool, e.g., 'Ask explorer to find all Python files'[/dim]")
         return CommandResult.success()
 
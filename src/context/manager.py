@@ -10,6 +10,7 @@ This module provides tools for:
 
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Literal
 import json
 import math
@@ -39,12 +40,23 @@ def _is_cjk_char(ch: str) -> bool:
     )
 
 
+@lru_cache(maxsize=1)
+def _get_encoder():
+    """The cl100k_base tokenizer, loaded once per process (None if unavailable)."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
 def _estimate_tokens_text(content: str) -> int:
     if not content:
         return 0
-    if tiktoken is not None:
+    encoder = _get_encoder()
+    if encoder is not None:
         try:
-            encoder = tiktoken.get_encoding("cl100k_base")
             return len(encoder.encode(content))
         except Exception:
             pass
@@ -136,6 +148,8 @@ class ContextManager:
         self.summary_token_estimate: int = 0
         self.total_messages_processed: int = 0
         self.compaction_count: int = 0
+        # Paths whose contents already match the current state
+        self._saved_paths: set[str] = set()
 
         if self.auto_save_path and os.path.exists(self.auto_save_path):
             loaded = self.load_from_file(self.auto_save_path)
@@ -181,6 +195,7 @@ class ContextManager:
         )
         self.messages.append(message)
         self.total_messages_processed += 1
+        self._saved_paths.clear()
 
         # Check if we need to compact
         if self.should_compact:
@@ -475,6 +490,7 @@ Provide a concise summary in bullet points."""
         self.messages.clear()
         self.summary = ""
         self.summary_token_estimate = 0
+        self._saved_paths.clear()
 
     def clear_keep_summary(self) -> None:
         """Clear messages but keep the summary."""
@@ -487,6 +503,7 @@ Provide a concise summary in bullet points."""
             new_summary = self._generate_summary(old_messages)
             self.summary = f"{self.summary}\n\n---\n\n{new_summary}"
             self.summary_token_estimate = _estimate_tokens_text(self.summary)
+            self._saved_paths.clear()
 
     def get_stats(self) -> dict:
         """Get statistics about the context."""
@@ -537,11 +554,15 @@ Provide a concise summary in bullet points."""
         self.max_tokens = other.max_tokens
         self.compact_threshold = other.compact_threshold
         self.keep_recent = other.keep_recent
+        self._saved_paths.clear()
 
     def save_to_file(self, path: str) -> None:
-        """Save context to a JSON file."""
+        """Save context to a JSON file (skipped if unchanged since the last save there)."""
+        if path in self._saved_paths and os.path.exists(path):
+            return
         with open(path, "w", encoding="utf-8") as f:
             json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        self._saved_paths.add(path)
 
     @classmethod
     def load_from_file(cls, path: str) -> "ContextManager":
@@ -11,7 +11,7 @@ Components:
 
 import asyncio
 import json
-from typing import Optional, List, Tuple, Dict, Any, Callable
+from typing import Optional, List, Tuple, Dict, Any, Callable, Mapping, Sequence
 from enum import Enum
 
 from prompt_toolkit import Application
@@ -220,7 +220,7 @@ class SelectionMenu:
     def __init__(
         self,
         title: str,
-        items: List[Dict[str, Any]],
+        items: Sequence[Mapping[str, Any]],
         description: Optional[str] = None,
         current_value: Optional[str] = None,
     ):
@@ -1085,7 +1085,7 @@ async def main() -> None:
     dispatcher = CommandDispatcher(app_state)
     
     # Clear screen and print dashboard
-    os.system("cls" if os.name == "nt" else "clear")
+    console.clear()
     print_dashboard(model)
     
     # Setup completer with fuzzy matching
@@ -1365,7 +1365,8 @@ async def main() -> None:
             
             if command == "/chatlog":
                 # /chatlog [query|stats|person] [args]
-                from src.chatlog import compose_chatlog_analysis_sync, get_chatlog_stats_sync
+                # Awaited on this loop: the chatlog tools share their Poe client with it
+                from src.chatlog import compose_chatlog_analysis_async, get_chatlog_stats_async
                 from src.chatlog.loader import get_chatlog_loader
                 
                 subparts = arg.strip().split(maxsplit=1)
@@ -1374,7 +1375,7 @@ async def main() -> None:
                 
                 if subcommand == "stats" or not subcommand:
                     # Show chatlog statistics
-                    result = get_chatlog_stats_sync()
+                    result = await get_chatlog_stats_async()
                     console.print(Markdown(result))
                 
                 elif subcommand == "query":
@@ -1388,7 +1389,7 @@ async def main() -> None:
                             chatlog_arg = parts[0].strip()
                             target_person = parts[1].split()[0] if parts[1] else None
                         
-                        result = compose_chatlog_analysis_sync(
+                        result = await compose_chatlog_analysis_async(
                             question=chatlog_arg,
                             target_person=target_person,
                             max_dimensions=4
@@ -1569,7 +1570,7 @@ async def main() -> None:
                 # Create brand new session ID
                 resume_session_id = session_manager.create_session()
                 session_start_time = datetime.now(timezone.utc)
-                os.system("cls" if os.name == "nt" else "clear")
+                console.clear()
                 print_dashboard(model)
                 console.print(f"[{COLORS['success']}]✓ 上下文已清除，新会话: {resume_session_id[:16]}...[/{COLORS['success']}]")
                 continue